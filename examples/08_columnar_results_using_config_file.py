@@ -0,0 +1,67 @@
+"""
+Example 3: Columnar Results
+
+This example demonstrates how to post-process simulation results as columns:
+- One contiguous float64 buffer per observable, aligned on a shared block index
+- Parsed metric key columns (agent, protocol, metric, labels) to filter observables
+- Zero-copy hand-over to Arrow when pyarrow is installed
+"""
+
+import logging
+import warnings
+
+
+warnings.filterwarnings("ignore")
+logging.getLogger().setLevel(logging.ERROR)
+logging.getLogger("root").setLevel(logging.ERROR)
+
+import yaml  # noqa: E402
+from columnar import ColumnarResults, block_index, row_count  # noqa: E402
+
+from nqs_sdk import Simulation  # noqa: E402
+from nqs_sdk.protocols import UniswapV3Factory  # noqa: E402
+
+
+def main() -> None:
+    """Run the basic liquidity simulation and expose its results as columns."""
+    print("=" * 60)
+    print("Example 3: Columnar Results")
+    print("=" * 60)
+
+    config_path = "./configs/basic_liquidity_config.yml"
+    print(f"[CONFIG] Loading configuration from {config_path}")
+    with open(config_path) as f:
+        common = yaml.safe_load(f)["common"]
+
+    try:
+        sim = Simulation([UniswapV3Factory()], config_path)
+        if sim.simulator is None:
+            print("[ERROR] Simulator is not initialized")
+            return
+        results = sim.simulator.run_to_dict()
+    except Exception as e:
+        print(f"[ERROR] Simulation failed: {e}")
+        return
+
+    columnar = ColumnarResults.from_dict(results, index=block_index(common, row_count(results)))
+    print(f"[SUCCESS] {len(columnar.columns)} observables x {len(columnar)} blocks")
+
+    print("\n[KEYS] Parsed metric keys:")
+    for key in columnar.keys[:10]:
+        print(f"  * agent={key.agent} protocol={key.protocol} metric={key.metric} labels={key.labels_str}")
+
+    print("\n[AGENT] liquidity_provider wallet holdings:")
+    for raw, column in columnar.select(agent="liquidity_provider", metric="wallet_holdings").items():
+        print(f"  * {raw}: {column[0]:,.0f} -> {column[-1]:,.0f} (dtype={column.dtype}, {column.nbytes} bytes)")
+
+    try:
+        values, keys = columnar.to_arrow()
+    except ImportError as e:
+        print(f"\n[SKIP] {e}")
+        return
+    print(f"\n[ARROW] values table: {values.num_columns} columns, {values.nbytes} bytes")
+    print(f"[ARROW] keys table: {keys.num_rows} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Resuming a Backtest from a Wallet Checkpoint
+
+This example demonstrates how to split a historical backtest into a shared prefix and several continuations:
+- The prefix (blocks 18725000 -> 18725005) is replayed once with the strategy all variants share, and the agent
+  wallet at its last block, with the swaps decided there and not submitted yet, is saved to a checkpoint file
+- Each variant restores that wallet and replays only the suffix (blocks 18725006 -> 18725010), with pools loaded from
+  their historical state at the first suffix block and the pending swaps submitted there, as they would have been
+  without the split
+
+Only the agent wallet and its pending swaps are checkpointed; this is not a snapshot of the simulation. Pools are
+reloaded from chain history, so any price impact of the agent's own prefix trades is dropped, and open positions,
+random generator states and generator cursors are not carried over. The result is exact when the prefix holds no
+position and its trades are small compared to the pool liquidity. Coding environment runs are not covered.
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from historical import AgentTransactions, historical_replay_builder
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_transactions import RawSwapTransaction
+
+
+POOL_ADDRESS = "0x3416cf6c708da44db2624d63ea0aaef7113527c6"
+AGENT_NAME = "swapper_agent"
+TOKENS = ["USDT", "USDC"]
+
+# `RawSwapTransaction` arguments
+SwapParams = Dict[str, Any]
+
+
+@dataclass
+class WalletCheckpoint:
+    """Agent wallets at the last block of a replayed prefix, and the swaps decided there, due at the next block."""
+
+    block: int
+    pool_addresses: List[str]
+    wallets: Dict[str, Dict[str, float]]
+    pending_swaps: Dict[str, List[SwapParams]] = field(default_factory=dict)
+
+    def save(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "WalletCheckpoint":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+
+def wallet_key(token: str) -> str:
+    return f'{AGENT_NAME}.all.wallet_holdings:{{token="{token}"}}'
+
+
+def run_segment(
+    start_block: int,
+    end_block: int,
+    wallet: Dict[str, float],
+    spot_threshold: Optional[float],
+    pending_swaps: Sequence[SwapParams] = (),
+) -> Tuple[Dict[str, float], List[SwapParams]]:
+    """
+    Replay `start_block -> end_block` from the historical pool state at `start_block`, submitting `pending_swaps` at
+    `start_block`; return the final wallet and the swaps decided at `end_block`, which were not submitted.
+    """
+    uniswap_pool = UniswapV3Pool.from_address(POOL_ADDRESS, start_block)
+
+    env_builder = historical_replay_builder([uniswap_pool], start_block, end_block, gas_fee=10)
+
+    dex_spot_key = f"{uniswap_pool.name}.dex_spot"
+    env_builder.register_agent(AGENT_NAME, wallet)
+    agent = AgentTransactions(AGENT_NAME, [*map(wallet_key, TOKENS), dex_spot_key])
+    env_builder.register_tx_generator(agent)
+    decided = list(pending_swaps)
+    for swap in decided:
+        agent.append_tx(RawSwapTransaction(**swap), uniswap_pool)
+
+    final_wallet = dict(wallet)
+    for out in env_builder.build():
+        decided = []  # the swaps decided at the previous block were submitted at this one
+        for token in TOKENS:
+            holding = out.observables.get(wallet_key(token))
+            if holding is not None:
+                final_wallet[token] = float(holding)
+        dex_spot = out.observables.get(dex_spot_key)
+        if spot_threshold is not None and dex_spot is not None and dex_spot <= spot_threshold:
+            swap = {"amount": 100000000, "zero_for_one": True, "sqrt_price_limit_x96": None}
+            agent.append_tx(RawSwapTransaction(**swap), uniswap_pool)
+            decided.append(swap)
+    assert len(decided) == len(agent.txns), "pending swaps out of sync with the agent transactions"
+    return final_wallet, decided
+
+
+def main() -> None:
+    prefix_start, prefix_end, suffix_end = 18725000, 18725005, 18725010
+
+    # replay the shared prefix once, with the strategy all variants have in common; block ranges are inclusive
+    wallet, pending_swaps = run_segment(prefix_start, prefix_end, {"USDT": 10000, "USDC": 10000}, spot_threshold=1.0)
+    with tempfile.TemporaryDirectory() as checkpoint_dir:
+        checkpoint_path = os.path.join(checkpoint_dir, "checkpoint.json")
+        checkpoint = WalletCheckpoint(prefix_end, [POOL_ADDRESS], {AGENT_NAME: wallet}, {AGENT_NAME: pending_swaps})
+        checkpoint.save(checkpoint_path)
+
+        # later, possibly in another process: restore the wallet and replay one continuation per variant
+        checkpoint = WalletCheckpoint.load(checkpoint_path)
+
+    for spot_threshold in [0.9995, 1.0, 1.0005]:
+        final_wallet, _ = run_segment(
+            checkpoint.block + 1,
+            suffix_end,
+            dict(checkpoint.wallets[AGENT_NAME]),
+            spot_threshold=spot_threshold,
+            pending_swaps=checkpoint.pending_swaps.get(AGENT_NAME, []),
+        )
+        print(f"threshold={spot_threshold}: {checkpoint.wallets[AGENT_NAME]} -> {final_wallet}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Example 4: Parameter Sweep
+
+This example demonstrates a Monte Carlo sweep over the dynamic market making config:
+- A grid over the GBM volatility and drift, crossed with a list of seeds
+- Variants run in parallel on a process pool sharing the parsed base config
+- Per-variant progress and failures, and one combined columnar table keyed by the variant parameters
+"""
+
+import logging
+import warnings
+
+
+warnings.filterwarnings("ignore")
+logging.getLogger().setLevel(logging.ERROR)
+logging.getLogger("root").setLevel(logging.ERROR)
+
+from sweep import expand_grid, print_progress, run_sweep  # noqa: E402
+
+
+def main() -> None:
+    """Run the dynamic market making config across volatilities, drifts and seeds."""
+    print("=" * 60)
+    print("Example 4: Parameter Sweep")
+    print("=" * 60)
+
+    config_path = "./configs/dynamic_market_making_config.yml"
+    variants = expand_grid(
+        {
+            "spot.spot_list.0.gbm.vol": [0.2, 0.4, 0.8],
+            "spot.spot_list.0.gbm.mu": [-0.1, 0.0, 0.1],
+            "common.plot_output": [False],
+        },
+        seeds=range(8),
+    )
+    print(f"[SWEEP] {len(variants)} variants of {config_path}")
+
+    sweep = run_sweep(config_path, variants, on_progress=print_progress)
+    print(f"\n[DONE] {len(sweep.outcomes) - len(sweep.failures)} succeeded, {len(sweep.failures)} failed")
+
+    net_position_key = "market_maker.all.net_position"
+    print("\n[RESULTS] Final net position per variant:")
+    for _, outcome in sorted(sweep.outcomes.items()):
+        if outcome.results is not None:
+            print(f"  * {outcome.params}: {outcome.results.columns[net_position_key][-1]:,.0f}")
+
+    try:
+        table = sweep.to_arrow()
+    except ImportError:
+        return
+    print(f"\n[ARROW] combined table: {table.num_rows} rows x {table.num_columns} columns")
+
+
+if __name__ == "__main__":
+    main()
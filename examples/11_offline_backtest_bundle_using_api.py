@@ -0,0 +1,44 @@
+"""
+Offline Backtests from a Data Bundle
+
+This example demonstrates how to run backtests without access to the data service:
+- `build` prefetches pool states, pool events and spot series for a set of pools and block ranges into one file
+- `run` replays a backtest from that file only; any query missing from the bundle fails instead of going online
+
+Usage:
+    python 11_offline_backtest_bundle_using_api.py build usdc_usdt.bundle
+    python 11_offline_backtest_bundle_using_api.py run usdc_usdt.bundle
+"""
+
+import argparse
+import time
+
+from bundle import build_bundle, open_bundle, replay
+
+
+POOLS = {"univ3_usdc_usdt": "0x3416cf6c708da44db2624d63ea0aaef7113527c6"}
+BLOCK_RANGES = [(18725000, 18725100), (18725100, 18725200)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["build", "run"])
+    parser.add_argument("bundle_path")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        manifest = build_bundle(args.bundle_path, POOLS, BLOCK_RANGES)
+        print(f"Built {args.bundle_path}: {len(manifest.files)} cached queries in {time.perf_counter() - start:.1f}s")
+        return
+
+    # a sub-range of a bundled range is accepted too
+    for start_block, end_block in BLOCK_RANGES + [(18725000, 18725050)]:
+        with open_bundle(args.bundle_path, POOLS, (start_block, end_block)):
+            start = time.perf_counter()
+            replay(POOLS, start_block, end_block)
+        print(f"Replayed blocks {start_block} -> {end_block} offline in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Prefetched Backtest
+
+This example demonstrates how to overlap a historical replay with the processing of its outputs:
+- The replay of historical swaps, mints and burns runs on a background thread
+- Steps are handed over in chunks through a bounded queue
+- Each chunk is turned into NumPy columns, enriched with log-returns and a rolling volatility and written to disk
+- The same consumer is timed with and without prefetching, with the wait times of both sides
+
+Usage:
+    python 12_prefetched_backtest_using_api.py --chunk-size 64 --queue-depth 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+import numpy as np
+from historical import historical_replay_builder
+from pipeline import Prefetcher
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+
+POOL_ADDRESS = "0x3416cf6c708da44db2624d63ea0aaef7113527c6"
+START_BLOCK, END_BLOCK = 18725000, 18726000
+VOLATILITY_WINDOW = 50
+
+
+def build_replay() -> Any:
+    uniswap_pool = UniswapV3Pool.from_address(POOL_ADDRESS, START_BLOCK)
+
+    env_builder = historical_replay_builder([uniswap_pool], START_BLOCK, END_BLOCK)
+    return env_builder.build(), uniswap_pool.name
+
+
+def plain_chunks(simulation: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    iterator = iter(simulation)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+class ChunkWriter:
+    """Writes each chunk as an `.npz` file of block, spot, liquidity, log-return and rolling volatility columns."""
+
+    def __init__(self, pool_name: str, out_dir: str) -> None:
+        self.keys = [f"{pool_name}.dex_spot", f"{pool_name}.liquidity"]
+        self.out_dir = out_dir
+        self.n_chunks = 0
+        self.last_volatility = np.nan
+        self._tail = np.empty(0)  # spots of the previous chunk needed by the rolling window
+
+    def process(self, chunk: List[Any]) -> None:
+        blocks = np.fromiter((out.block for out in chunk), dtype=np.int64, count=len(chunk))
+        spot, liquidity = (
+            np.array([out.observables.get(key, np.nan) for out in chunk], dtype=np.float64) for key in self.keys
+        )
+        # log-returns and rolling volatility, continued from the last spots of the previous chunk
+        spots = np.concatenate([self._tail, spot])
+        log_returns = np.full(len(spots), np.nan)
+        log_returns[1:] = np.diff(np.log(spots))
+        padded = np.concatenate([np.full(VOLATILITY_WINDOW - 1, np.nan), log_returns])
+        volatility = np.lib.stride_tricks.sliding_window_view(padded, VOLATILITY_WINDOW).std(axis=1)
+        self._tail = spots[-VOLATILITY_WINDOW:]
+        self.last_volatility = volatility[-1]
+
+        np.savez_compressed(
+            os.path.join(self.out_dir, f"chunk_{self.n_chunks:05d}.npz"),
+            block=blocks,
+            dex_spot=spot,
+            liquidity=liquidity,
+            log_return=log_returns[-len(spot) :],
+            volatility=volatility[-len(spot) :],
+        )
+        self.n_chunks += 1
+
+
+def run(chunk_size: int, queue_depth: Optional[int]) -> None:
+    simulation, pool_name = build_replay()
+    with tempfile.TemporaryDirectory() as out_dir:
+        writer = ChunkWriter(pool_name, out_dir)
+        prefetcher = None
+        start = time.perf_counter()
+        if queue_depth is None:
+            chunks: Iterable[List[Any]] = plain_chunks(simulation, chunk_size)
+        else:
+            prefetcher = Prefetcher(simulation, chunk_size=chunk_size, queue_depth=queue_depth)
+            chunks = prefetcher.chunks()
+        for chunk in chunks:
+            writer.process(chunk)
+        elapsed = time.perf_counter() - start
+
+    mode = "plain iterator" if prefetcher is None else f"prefetched, queue depth {queue_depth}"
+    print(f"[{mode}] {writer.n_chunks} chunks written in {elapsed:.2f}s, last volatility {writer.last_volatility:.2e}")
+    if prefetcher is not None:
+        print(f"  {prefetcher.stats}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--queue-depth", type=int, default=4)
+    args = parser.parse_args()
+
+    run(args.chunk_size, queue_depth=None)
+    run(args.chunk_size, queue_depth=args.queue_depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from observables import ObservableCache
+
+from nqs_sdk.bindings.protocols.uniswap_v3.spots.historical_uniswap_pool import HistoricalSpotGenerator
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.coding_envs.coding_env import CodingEnv
+from nqs_sdk.coding_envs.policy_caller import PolicyCaller
+from nqs_sdk.coding_envs.protocols.coding_protocol import CodingProtocol
+from nqs_sdk.coding_envs.protocols.uniswap_v3.uniswap_v3_coding_env import UniswapV3CodingProtocol
+from nqs_sdk.utils.logging import local_logger
+
+
+logger = local_logger(__name__)
+
+
+class VolatilityRangeStrategy(PolicyCaller):
+    """Keep a position centred on the spot, with a width following the recent spot range."""
+
+    def __init__(self, window: int = 50, min_range_pct: float = 0.0005) -> None:
+        self.position_id = "volatility_position"
+        self.has_position = False
+        self.window = window
+        self.min_range_pct = min_range_pct
+        self.caches: dict[str, ObservableCache] = {}
+
+    def policy(self, block: int, protocols: dict[str, CodingProtocol]) -> None:
+        for name, protocol in protocols.items():
+            if not isinstance(protocol, UniswapV3CodingProtocol):
+                raise TypeError("This strategy requires UniswapV3CodingProtocol instances")
+
+            cache = self.caches.setdefault(name, ObservableCache(protocol))
+            cache.begin_block(block)
+
+            # one history read per block, shared with cache.latest; the min and max are updated incrementally
+            spots = cache.window_stats("dex_spot", self.window)
+            if spots.count < self.window:
+                continue
+            current_spot = float(cache.latest("dex_spot"))
+            range_pct = max(self.min_range_pct, (spots.max - spots.min) / current_spot)
+
+            usdc = protocol.get_wallet_holdings("USDC")
+            usdt = protocol.get_wallet_holdings("USDT")
+            if self.has_position:
+                position_lower, position_upper = protocol.position_bounds(self.position_id)
+                if position_lower < current_spot < position_upper:
+                    continue
+                protocol.burn(1.0, self.position_id)
+                usdc += protocol.token_amount("USDC", self.position_id)
+                usdt += protocol.token_amount("USDT", self.position_id)
+            elif usdc == 0 or usdt == 0:
+                continue
+
+            lower_bound = current_spot * (1 - range_pct)
+            upper_bound = current_spot * (1 + range_pct)
+            # FIXME -1 hack to avoid overflow in Mint (due to raw conversion)
+            protocol.mint(lower_bound, upper_bound, usdc - 1, usdt - 1, self.position_id)
+            self.has_position = True
+            liquidity = cache.latest("liquidity")
+            logger.info(f"Position at block {block}: {lower_bound}:{upper_bound}, pool liquidity {liquidity}")
+
+
+def main() -> None:
+    # pool token order (sorted by address on chain): mint takes the USDC amount first
+    uniswap_pool = UniswapV3Pool.from_params(token0="USDC", token1="USDT", fee_tier=0.01, blocknumber=18725000)
+    uniswap_v3_coding_env = UniswapV3CodingProtocol(uniswap_pool)
+    spot_generator = HistoricalSpotGenerator([uniswap_v3_coding_env.protocol])
+
+    env = CodingEnv(do_backtest=True)
+    env.register_protocol(uniswap_v3_coding_env)
+    env.register_spot_generator(spot_generator)
+    env.set_simulation_time(18725000, 18727000, 1)  # FIXME NOT TIME; THESE ARE BLOCK NUMBERS
+    env.set_numeraire("USDC")
+    env.set_gas_fee(10000000, "USDC")
+
+    env.register_agent("agent_1", {"USDC": 1500, "USDT": 1000}, VolatilityRangeStrategy())
+    out = env.run()
+    logger.info(f"Run outputs {len(out)} observables")
+
+
+if __name__ == "__main__":
+    main()
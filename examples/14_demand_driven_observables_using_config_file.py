@@ -0,0 +1,68 @@
+"""
+Example 5: Demand-Driven Observables
+
+This example demonstrates how to check whether a run can skip exporting every observable:
+- Metrics referenced by the action conditions, plus the outputs read afterwards, are collected from the config
+- The config is run with `collect_all_observables: false`, so each step only exports the observables selected by
+  the engine (the config file cannot list them)
+- Run time and number of exported observables are compared with the default export of everything, and the collected
+  metrics missing from the reduced export are listed
+"""
+
+import logging
+import warnings
+
+
+warnings.filterwarnings("ignore")
+logging.getLogger().setLevel(logging.ERROR)
+logging.getLogger("root").setLevel(logging.ERROR)
+
+import time  # noqa: E402
+from typing import Any, Dict, Tuple  # noqa: E402
+
+import yaml  # noqa: E402
+from demand import demand_driven_config, missing_metrics, required_metrics  # noqa: E402
+from runner import run_config  # noqa: E402
+
+
+def run(config: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    start = time.perf_counter()
+    return run_config(config), time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the basic config with all observables, then with the observables it needs only."""
+    print("=" * 60)
+    print("Example 5: Demand-Driven Observables")
+    print("=" * 60)
+
+    config_path = "./configs/basic_config.yml"
+    with open(config_path) as f:
+        config = yaml.safe_load(f)
+
+    outputs = ["agent_1.all.net_position"]
+    metrics = required_metrics(config, outputs)
+    print(f"[CONFIG] {config_path} depends on {len(metrics)} metrics:")
+    for metric in sorted(metrics):
+        print(f"  * {metric}")
+
+    try:
+        all_results, all_elapsed = run(config)
+        selected_results, selected_elapsed = run(demand_driven_config(config))
+    except Exception as e:
+        print(f"[ERROR] Simulation failed: {e}")
+        return
+
+    print("\n[RESULTS]")
+    print(f"  * collect_all_observables: true  -> {len(all_results)} observables in {all_elapsed:.2f}s")
+    print(f"  * collect_all_observables: false -> {len(selected_results)} observables in {selected_elapsed:.2f}s")
+
+    missing = missing_metrics(selected_results, metrics)
+    if missing:
+        print(f"[WARNING] Needed but not exported without collect_all_observables: {sorted(missing)}")
+    else:
+        print("[CHECK] All needed metrics are exported without collect_all_observables")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+from historical import AgentTransactions, historical_replay_builder
+from schedule import WakeSchedule
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_transactions import RawSwapTransaction
+
+
+def main() -> None:
+    start_block, end_block = 18725000, 18735000
+    uniswap_pool = UniswapV3Pool.from_address("0x3416cf6c708da44db2624d63ea0aaef7113527c6", start_block)
+
+    env_builder = historical_replay_builder([uniswap_pool], start_block, end_block, gas_fee=10)
+
+    # rebalance every 1000 blocks, plus a one-off check at a known event
+    schedule = WakeSchedule(start_block, end_block).every(1000, "rebalance").at(18730500, "event_check")
+
+    agent_name = "sparse_agent"
+    dex_spot_key = f"{uniswap_pool.name}.dex_spot"
+    env_builder.register_agent(agent_name, {"USDT": 10000, "USDC": 10000})
+    # metrics are only requested for the decision blocks, and decided transactions are submitted one block later
+    agent_handler = AgentTransactions(agent_name, [dex_spot_key], schedule, sparse_metrics=True)
+    env_builder.register_tx_generator(agent_handler)
+
+    decisions = 0
+    for out in env_builder.build():
+        next_decision = schedule.peek()
+        if next_decision is None or out.block < next_decision:
+            continue  # nothing to decide: do not touch the observables of this block
+
+        due = schedule.pop_due(out.block)
+        decisions += 1
+        dex_spot = out.observables.get(dex_spot_key)
+        print(f"block {out.block}: {sorted(due)} dex_spot={dex_spot}")
+        if dex_spot is not None and dex_spot <= 1:
+            raw_swap_tx = RawSwapTransaction(amount=100000000, zero_for_one=True, sqrt_price_limit_x96=None)
+            agent_handler.append_tx(raw_swap_tx, uniswap_pool)
+
+    print(f"{decisions} decisions over {end_block - start_block + 1} blocks")
+
+
+if __name__ == "__main__":
+    main()
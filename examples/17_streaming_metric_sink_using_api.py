@@ -0,0 +1,40 @@
+"""
+Streaming Metric Sink
+
+This example demonstrates how to record a long run with bounded memory:
+- Observables are flushed to an Arrow IPC stream file every `--buffer-size` blocks while the simulation runs
+- The pool liquidity is averaged over buckets of 100 blocks, written on the last block of each bucket
+- The file stays readable up to the last flushed batch if the run is interrupted
+
+Usage:
+    python 17_streaming_metric_sink_using_api.py --output metrics.arrow --buffer-size 1000
+"""
+
+import argparse
+
+from historical import historical_replay_builder
+from sinks import StreamingMetricSink, read_partial
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="metrics.arrow")
+    parser.add_argument("--buffer-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    uniswap_pool = UniswapV3Pool.from_address("0x3416cf6c708da44db2624d63ea0aaef7113527c6", 18725000)
+
+    env_builder = historical_replay_builder([uniswap_pool], 18725000, 18735000)
+
+    keys = [f"{uniswap_pool.name}.dex_spot", f"{uniswap_pool.name}.liquidity"]
+    with StreamingMetricSink(args.output, keys, args.buffer_size, downsample={keys[1]: 100}) as sink:
+        sink.consume(env_builder.build())
+
+    table = read_partial(args.output)
+    print(f"Wrote {sink.rows_written} rows to {args.output}; read back {table.num_rows} rows x {table.num_columns}")
+
+
+if __name__ == "__main__":
+    main()
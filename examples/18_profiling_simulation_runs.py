@@ -0,0 +1,119 @@
+"""
+Profiling Simulation Runs
+
+This example demonstrates how to find where the time of a run goes:
+- Config file runs: simulation construction vs. run
+- Lower-level API runs: pool loading, engine steps and the Python `TxGenerator.next` / `consume` callbacks
+- Coding environment runs: the Python `PolicyCaller.policy` callback and its observable reads and cache hits
+
+Each profile is written as a JSON report, a Chrome trace (open it in Perfetto or speedscope) and folded stacks.
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Any
+
+from historical import historical_replay_builder
+from observables import ObservableCache
+from profiling import Profiler
+
+from nqs_sdk import Simulation
+from nqs_sdk.bindings.protocols.uniswap_v3.spots.historical_uniswap_pool import HistoricalSpotGenerator
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.coding_envs.coding_env import CodingEnv
+from nqs_sdk.coding_envs.policy_caller import PolicyCaller
+from nqs_sdk.coding_envs.protocols.coding_protocol import CodingProtocol
+from nqs_sdk.coding_envs.protocols.uniswap_v3.uniswap_v3_coding_env import UniswapV3CodingProtocol
+from nqs_sdk.protocols import UniswapV3Factory as ConfigUniswapV3Factory
+
+
+POOL_ADDRESS = "0x3416cf6c708da44db2624d63ea0aaef7113527c6"
+
+
+def profile_config_file(profiler: Profiler) -> None:
+    with profiler.phase("simulation.build"):
+        sim = Simulation([ConfigUniswapV3Factory()], "./configs/basic_liquidity_config.yml")
+    with profiler.phase("simulation.run"):
+        sim.run()
+
+
+def profile_lower_api(profiler: Profiler) -> None:
+    with profiler.phase("pool.load"):
+        uniswap_pool = UniswapV3Pool.from_address(POOL_ADDRESS, 18725000)
+
+    with profiler.phase("env.build"):
+        env_builder = historical_replay_builder(
+            [uniswap_pool],
+            18725000,
+            18725100,
+            wrap_tx_generator=lambda tx_generator: profiler.instrument(tx_generator, "next", "consume"),
+        )
+        simulation = env_builder.build()
+
+    for _ in profiler.iterate(simulation):
+        profiler.count("steps")
+
+
+class SpotReader(PolicyCaller):
+    def __init__(self) -> None:
+        self.caches: dict[str, ObservableCache] = {}
+
+    def policy(self, block: int, protocols: dict[str, CodingProtocol]) -> None:
+        for name, protocol in protocols.items():
+            cache = self.caches.setdefault(name, ObservableCache(protocol))
+            cache.begin_block(block)
+            cache.latest("dex_spot")
+            cache.latest("dex_spot")
+
+
+def profile_coding_env(profiler: Profiler) -> None:
+    with profiler.phase("env.build"):
+        uniswap_pool = UniswapV3Pool.from_params(token0="USDT", token1="USDC", fee_tier=0.01, blocknumber=18725000)
+        uniswap_v3_coding_env = UniswapV3CodingProtocol(uniswap_pool)
+        env = CodingEnv(do_backtest=True)
+        env.register_protocol(uniswap_v3_coding_env)
+        env.register_spot_generator(HistoricalSpotGenerator([uniswap_v3_coding_env.protocol]))
+        env.set_simulation_time(18725000, 18725100, 1)  # FIXME NOT TIME; THESE ARE BLOCK NUMBERS
+        env.set_numeraire("USDC")
+        env.set_gas_fee(10000000, "USDC")
+        policy_caller = SpotReader()
+        env.register_agent("agent_1", {"USDC": 1500, "USDT": 1000}, profiler.instrument(policy_caller, "policy"))
+
+    with profiler.phase("env.run"):
+        env.run()
+
+    for cache in policy_caller.caches.values():
+        profiler.count("observable.reads", cache.reads)
+        profiler.count("observable.cache_hits", cache.hits)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output-dir", default=os.path.join(tempfile.gettempdir(), "nqs_profiles"))
+    parser.add_argument("--allocations", action="store_true", help="also track Python allocations (slower)")
+    args = parser.parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    runs: dict[str, Any] = {
+        "config_file": profile_config_file,
+        "lower_api": profile_lower_api,
+        "coding_env": profile_coding_env,
+    }
+    for name, run in runs.items():
+        with Profiler(track_allocations=args.allocations) as profiler:
+            run(profiler)
+        prefix = os.path.join(args.output_dir, name)
+        profiler.write_report(f"{prefix}.json")
+        profiler.write_trace(f"{prefix}.trace.json")
+        profiler.write_folded(f"{prefix}.folded")
+
+        print(f"[{name}] written to {prefix}.*")
+        for phase, stats in profiler.report()["phases"].items():
+            print(f"  {phase:<45} {stats['calls']:>7} calls {stats['total_s']:>9.3f}s (self {stats['self_s']:.3f}s)")
+        for counter, value in profiler.counters.items():
+            print(f"  {counter:<45} {value:>7}")
+
+
+if __name__ == "__main__":
+    main()
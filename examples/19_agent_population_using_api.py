@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+from population import AgentPopulation
+
+from nqs_sdk.bindings.protocols.uniswap_v3.spots.historical_uniswap_pool import HistoricalSpotGenerator
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.coding_envs.coding_env import CodingEnv
+from nqs_sdk.coding_envs.protocols.uniswap_v3.uniswap_v3_coding_env import UniswapV3CodingProtocol
+from nqs_sdk.utils.logging import local_logger
+
+
+logger = local_logger(__name__)
+
+
+# pool token order (sorted by address on chain): mint takes the USDC amount first
+TOKEN0, TOKEN1 = "USDC", "USDT"
+
+
+def main() -> None:
+    uniswap_pool = UniswapV3Pool.from_params(token0=TOKEN0, token1=TOKEN1, fee_tier=0.01, blocknumber=18725000)
+    uniswap_v3_coding_env = UniswapV3CodingProtocol(uniswap_pool)
+    spot_generator = HistoricalSpotGenerator([uniswap_v3_coding_env.protocol])
+
+    env = CodingEnv(do_backtest=True)
+    env.register_protocol(uniswap_v3_coding_env)
+    env.register_spot_generator(spot_generator)
+    env.set_simulation_time(18725000, 18725100, 1)  # FIXME NOT TIME; THESE ARE BLOCK NUMBERS
+    env.set_numeraire("USDC")
+    env.set_gas_fee(10000000, "USDC")
+
+    # 5000 LP agents, with range widths spread between +/- 0.01% and +/- 1%, deciding every 10 blocks
+    range_pct = np.geomspace(0.0001, 0.01, num=5000)
+    population = AgentPopulation("lp", uniswap_pool.name, (TOKEN0, TOKEN1), range_pct, decide_every=10, fees_every=50)
+    population.register(env, {TOKEN0: 1500, TOKEN1: 1000})
+
+    start = time.perf_counter()
+    out = env.run()
+    logger.info(f"Run with {len(population.names)} agents outputs {len(out)} observables")
+    state = population.state
+    logger.info(f"Took {time.perf_counter() - start:.1f}s, {state.has_position.sum()} positions open")
+    logger.info(f"Uncollected fees of open positions at their last refresh: {np.nansum(state.fees):.2f} USDC")
+
+
+if __name__ == "__main__":
+    main()
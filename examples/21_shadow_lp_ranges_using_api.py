@@ -0,0 +1,81 @@
+"""
+Shadow LP Ranges
+
+This example demonstrates how to evaluate many passive liquidity ranges with a single historical replay:
+- 2000 candidate ranges around the initial pool price, combining widths and offsets
+- Each candidate is a shadow position: it does not trade against the pool, its amounts follow the replayed price,
+  updated for all candidates at once after each step
+- With `--volumes`, a CSV file of `block,volume0,volume1,pool_liquidity` rows (swap input amounts of each block and
+  active pool liquidity, in token units; a `block,volume0_raw,volume1_raw,pool_liquidity_raw` header declares raw
+  on-chain integers, converted with the token decimals), fees accrue from the volume in proportion to each
+  position's share of the active liquidity; the replay itself does not export swap volumes
+- Candidates are ranked by net position at the end of the replay; without volumes it holds no fees, and the fees
+  implied by net price moves are shown for reference only, as they miss most of the volume of a stable pool
+
+Usage:
+    python 21_shadow_lp_ranges_using_api.py --volumes usdc_usdt_volumes.csv
+"""
+
+import argparse
+import time
+from typing import Optional
+
+import numpy as np
+from historical import historical_replay_builder
+from shadow import ShadowPositions, Volumes, load_volumes
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+
+POOL_FEE = 0.0001  # USDC/USDT 0.01% pool
+TOKEN_DECIMALS = (6, 6)  # USDC, USDT
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--volumes", help="CSV file of block,volume0,volume1,pool_liquidity rows")
+    args = parser.parse_args()
+    volumes: Optional[Volumes] = load_volumes(args.volumes, TOKEN_DECIMALS) if args.volumes else None
+
+    uniswap_pool = UniswapV3Pool.from_address("0x3416cf6c708da44db2624d63ea0aaef7113527c6", 18725000)
+
+    env_builder = historical_replay_builder([uniswap_pool], 18725000, 18730000)
+
+    dex_spot_key = f"{uniswap_pool.name}.dex_spot"
+    start = time.perf_counter()
+    positions = None
+    for out in env_builder.build():
+        spot = float(out.observables.get(dex_spot_key))
+        if positions is None:
+            # 40 widths from +/- 0.01% to +/- 2% x 50 offsets of the range centre from -0.5% to +0.5%
+            width, offset = np.meshgrid(np.geomspace(0.0001, 0.02, 40), np.linspace(-0.005, 0.005, 50))
+            centre = spot * (1 + offset.ravel())
+            positions = ShadowPositions(centre * (1 - width.ravel()), centre * (1 + width.ravel()), POOL_FEE, 10_000)
+        if volumes is None:
+            positions.update(spot)
+        else:
+            # blocks missing from the file had no swap
+            volume0, volume1, pool_liquidity = volumes.get(out.block, (0.0, 0.0, np.inf))
+            positions.update(spot, volume0, volume1, pool_liquidity)
+    if positions is None:
+        print("No step replayed")
+        return
+
+    results = positions.results()
+    print(f"Evaluated {len(positions)} ranges over {positions.steps} blocks in {time.perf_counter() - start:.2f}s")
+    if volumes is None:
+        print("No volumes given: net positions hold no fees")
+    print("Best ranges by net position:")
+    for i in np.argsort(results["net_position"])[::-1][:5]:
+        fees = results["fees0"][i] * spot + results["fees1"][i]
+        price_move_fees = results["price_move_fees0"][i] * spot + results["price_move_fees1"][i]
+        print(
+            f"  [{results['price_lower'][i]:.5f}, {results['price_upper'][i]:.5f}]"
+            f" net position {results['net_position'][i]:,.2f}"
+            f" fees {fees:,.2f} (from net price moves: {price_move_fees:,.2f})"
+            f" in range {results['time_in_range'][i]:.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Chunked Stepping
+
+This example demonstrates how to drive a simulation from Python in chunks instead of block by block:
+- The simulation advances up to 1000 blocks per call, collecting only the pool spot, as a NumPy column
+- An agent decides every 250 blocks, from the spot history of the chunk; stepping stops exactly at those blocks
+- Its transactions are submitted at the next block through a transaction generator sharing the same schedule
+"""
+
+import numpy as np
+from historical import AgentTransactions, historical_replay_builder
+from schedule import WakeSchedule
+from stepping import Stepper
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_transactions import RawSwapTransaction
+
+
+def main() -> None:
+    start_block, end_block = 18725000, 18735000
+    uniswap_pool = UniswapV3Pool.from_address("0x3416cf6c708da44db2624d63ea0aaef7113527c6", start_block)
+
+    env_builder = historical_replay_builder([uniswap_pool], start_block, end_block, gas_fee=10)
+
+    schedule = WakeSchedule(start_block, end_block).every(250, "decide", first_block=start_block + 250)
+    agent_name = "chunked_agent"
+    dex_spot_key = f"{uniswap_pool.name}.dex_spot"
+    env_builder.register_agent(agent_name, {"USDT": 10000, "USDC": 10000})
+    agent_handler = AgentTransactions(agent_name, [dex_spot_key], schedule)
+    env_builder.register_tx_generator(agent_handler)
+
+    stepper = Stepper(env_builder.build(), [dex_spot_key], schedule)
+    steps, chunks, decisions = 0, 0, 0
+    while not stepper.done:
+        chunk = stepper.step_many(1000)
+        steps, chunks = steps + len(chunk), chunks + 1
+        if not chunk.decision_due:
+            continue
+
+        schedule.pop_due(int(chunk.blocks[-1]))
+        decisions += 1
+        spots = chunk.columns[dex_spot_key]
+        if spots[-1] < np.nanmean(spots):
+            raw_swap_tx = RawSwapTransaction(amount=100000000, zero_for_one=True, sqrt_price_limit_x96=None)
+            agent_handler.append_tx(raw_swap_tx, uniswap_pool)
+
+    print(f"{steps} blocks in {chunks} chunks, {decisions} decisions")
+
+
+if __name__ == "__main__":
+    main()
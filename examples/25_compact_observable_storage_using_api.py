@@ -0,0 +1,52 @@
+"""
+Compact Observable Storage
+
+This example demonstrates how to choose the storage of each observable of a long replay:
+- The pool spot is kept in full, as fixed-point int64 with 8 decimals
+- The pool liquidity is kept in a ring buffer of the last 1000 blocks
+- The spot is also recorded as OHLC bars of 100 blocks, and every other observable as 100-block means
+- The memory held per metric is reported against keeping every observable as float64 for every block
+"""
+
+from historical import historical_replay_builder
+from storage import MetricSpec, ObservableStore
+
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+
+def main() -> None:
+    uniswap_pool = UniswapV3Pool.from_address("0x3416cf6c708da44db2624d63ea0aaef7113527c6", 18725000)
+
+    env_builder = historical_replay_builder([uniswap_pool], 18725000, 18735000)
+
+    dex_spot_key = f"{uniswap_pool.name}.dex_spot"
+    liquidity_key = f"{uniswap_pool.name}.liquidity"
+    store = ObservableStore(
+        {
+            dex_spot_key: MetricSpec(dtype="int64", scale=8),
+            liquidity_key: MetricSpec(capacity=1000),
+        },
+        default=MetricSpec(bucket=100, mode="mean"),
+    )
+    bars = ObservableStore({dex_spot_key: MetricSpec(bucket=100, mode="ohlc")})
+
+    n_steps = 0
+    for out in env_builder.build():
+        store.append(out.block, out.observables)
+        bars.append(out.block, out.observables)
+        n_steps += 1
+    store.flush()
+    bars.flush()
+
+    full = n_steps * 16 * len(store.memory_report())  # one block and one float64 value per observable and step
+    print(f"Recorded {len(store.memory_report())} observables over {n_steps} blocks: {store.nbytes:,} bytes")
+    print(f"Full float64 histories would hold {full:,} bytes")
+    for key, nbytes in list(store.memory_report().items())[:10]:
+        print(f"  {key:<60} {nbytes:>10,} bytes")
+
+    blocks, ohlc = bars.history(dex_spot_key)
+    print(f"{len(blocks)} spot bars, last: open {ohlc[-1, 0]} high {ohlc[-1, 1]} low {ohlc[-1, 2]} close {ohlc[-1, 3]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark Suite
+
+This example runs the performance benchmarks on synthetic local data, without access to the data service:
+- Config file, `SimulatorEnvBuilder` and `CodingEnv` scenarios at several scales (blocks, pools, agents)
+- Blocks/s, startup time, peak RSS and per-phase timings per benchmark, saved to a JSON file
+- With `--baseline`, benchmarks that regressed by more than `--tolerance` are listed and the exit code is 1
+
+Usage:
+    python 26_benchmark_suite.py --scales small medium --output baseline.json
+    python 26_benchmark_suite.py --scales small medium --baseline baseline.json --output current.json
+"""
+
+import argparse
+import sys
+
+from benchmark import SCALES, SCENARIOS, BenchmarkResult, compare, load_results, run_suite, save_results
+
+
+def print_result(result: BenchmarkResult) -> None:
+    if not result.ok:
+        print(f"{result.id:<24} FAILED: {(result.error or '').strip().splitlines()[-1]}")
+        return
+    peak_rss = f"{result.peak_rss_bytes / 2**20:,.0f} MiB" if result.peak_rss_bytes is not None else "n/a"
+    print(
+        f"{result.id:<24} {result.blocks_per_s:>10,.0f} blocks/s  startup {result.startup_s:>6.2f}s"
+        f"  run {result.run_s:>8.2f}s  peak RSS {peak_rss}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=sorted(SCENARIOS))
+    parser.add_argument("--scales", nargs="+", choices=list(SCALES), default=["small"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, the median one is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per run")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression per metric")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline) if args.baseline else None
+    results = run_suite(
+        args.scenarios,
+        [SCALES[name] for name in args.scales],
+        repeat=args.repeat,
+        seed=args.seed,
+        timeout=args.timeout,
+        on_result=print_result,
+    )
+    save_results(args.output, results)
+    print(f"Results written to {args.output}")
+
+    if baseline is None:
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"No regression against {args.baseline}")
+        return
+    print(f"{len(regressions)} regression(s) against {args.baseline}:")
+    for regression in regressions:
+        print(f"  * {regression}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
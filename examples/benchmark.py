@@ -0,0 +1,469 @@
+"""
+Reproducible performance benchmarks on synthetic local data.
+
+Every benchmark builds its own data, so no data service access is needed: pools are created from custom parameters
+and the transaction streams come from seeded agents. Each scenario exercises one way of running a simulation, modelled
+on the examples:
+
+- `config_file`: `Simulation` on a generated config file with custom-state pools, a seeded GBM spot and LP / swap
+  agents
+- `env_builder`: a `SimulatorEnvBuilder` loop with seeded synthetic swap `TxGenerator`s
+- `coding_env`: a `CodingEnv` run with a vectorised population of LP agents
+
+and runs at several `Scale`s (blocks, pools, agents). Each run happens in a fresh process, pointed at an empty
+`QUANTLIB_CACHE` and an unreachable data service, and records blocks/s, startup time (imports and construction),
+peak RSS and the per-phase timings of a `profiling.Profiler`.
+
+The lower-level API only offers historical spot generators, which need the data service, so the `env_builder` and
+`coding_env` scenarios register no spot generator: their pool prices move with the agents' own swaps only.
+
+Results are saved as a JSON baseline; `compare` flags the benchmarks that got slower, or use more memory, than the
+baseline by more than a tolerance.
+"""
+
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from bundle import OFFLINE_QUANTLIB_CONFIG
+from profiling import Profiler
+
+
+BASELINE_FORMAT_VERSION = 1
+START_BLOCK = 18725000
+
+# token decimals and typical trade sizes, in token units
+TOKENS: Dict[str, Tuple[int, float]] = {
+    "USDC": (6, 1_000.0),
+    "USDT": (6, 1_000.0),
+    "DAI": (18, 1_000.0),
+    "WETH": (18, 0.5),
+    "WBTC": (8, 0.02),
+}
+PAIRS = [("USDT", "USDC"), ("WETH", "USDC"), ("WBTC", "WETH"), ("DAI", "USDC"), ("WETH", "USDT")]
+FEE_TIERS = [0.01, 0.05, 0.3, 1.0]
+
+
+@dataclass(frozen=True)
+class Scale:
+    name: str
+    blocks: int
+    pools: int
+    agents: int
+
+
+SCALES = {
+    scale.name: scale
+    for scale in (
+        Scale("small", blocks=1_000, pools=1, agents=1),
+        Scale("medium", blocks=10_000, pools=4, agents=10),
+        Scale("large", blocks=50_000, pools=16, agents=100),
+    )
+}
+
+
+def pool_params(index: int) -> Tuple[str, str, float]:
+    """Token pair and fee tier of the `index`-th synthetic pool; all (pair, fee tier) combinations are distinct."""
+    token0, token1 = PAIRS[index % len(PAIRS)]
+    return token0, token1, FEE_TIERS[(index // len(PAIRS)) % len(FEE_TIERS)]
+
+
+def synthetic_config(scale: Scale, seed: int) -> Dict[str, Any]:
+    """Config file contents with `scale.pools` WETH/USDC custom-state pools and `scale.agents` LP / swap agents."""
+    pools = [
+        {
+            "pool_name": f"bench_pool_{i}",
+            "symbol_token0": "WETH",
+            "symbol_token1": "USDC",
+            "fee_tier": FEE_TIERS[i % len(FEE_TIERS)],
+            "initial_balance": {"amount": 10_000_000, "unit": "token1"},
+        }
+        for i in range(scale.pools)
+    ]
+    agents = []
+    for i in range(scale.agents):
+        pool_name = pools[i % scale.pools]["pool_name"]
+        agents.append(
+            {
+                "name": f"bench_agent_{i}",
+                "wallet": {"USDC": 50_000, "WETH": 25},
+                "strategy": {
+                    "timed_events": [
+                        {
+                            "name": "open_position",
+                            "block_number": START_BLOCK + 1,
+                            "actions": [
+                                {
+                                    "action_name": "mint_position",
+                                    "protocol_id": pool_name,
+                                    "name": "mint",
+                                    "args": {
+                                        "amount1": 20_000,
+                                        "price_lower": 1_800,
+                                        "price_upper": 2_200,
+                                        "token_id": f"position_{i}",
+                                    },
+                                }
+                            ],
+                        }
+                    ],
+                    "continuous_events": [
+                        {
+                            "name": "trade",
+                            "block_number": START_BLOCK + 2 + i % 10,
+                            "frequency": 10,
+                            "actions": [
+                                {
+                                    "action_name": "swap_usdc",
+                                    "protocol_id": pool_name,
+                                    "name": "swap",
+                                    "args": {"amount1_in": 100},
+                                }
+                            ],
+                        }
+                    ],
+                },
+            }
+        )
+    return {
+        "version": "1.0.0",
+        "common": {
+            "block_number_start": START_BLOCK,
+            "block_number_end": START_BLOCK + scale.blocks - 1,
+            "block_step_metrics": max(1, scale.blocks // 100),
+            "numeraire": "USDC",
+            "gas_fee": 0,
+            "gas_fee_ccy": "USDC",
+            "arbitrage_block_frequency": 1,
+            "plot_output": False,
+            "save_metrics": False,
+        },
+        "spot": {
+            "spot_list": [{"name": "WETH/USDC", "gbm": {"s0": 2000, "mu": 0.0, "vol": 0.4}}],
+            "correlation": [[1.0]],
+        },
+        "simulation_environment": {
+            "seed": seed,
+            "tokens_info": {token: {"decimals": TOKENS[token][0]} for token in ("WETH", "USDC")},
+            "protocols_to_simulate": {"uniswap_v3": {"initial_state": {"custom_state": {"pools": pools}}}},
+        },
+        "agents": agents,
+    }
+
+
+def _custom_pool(index: int) -> Any:
+    from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+    token0, token1, fee_tier = pool_params(index)
+    initial_amount = TOKENS[token0][1] * 100_000
+    return UniswapV3Pool.from_custom_params(
+        token0=token0, token1=token1, fee_tier=fee_tier, initial_amount=initial_amount, unit="token0"
+    )
+
+
+def run_config_file(profiler: Profiler, scale: Scale, seed: int) -> None:
+    from runner import build_simulation
+
+    with profiler.phase("import"):
+        from nqs_sdk.protocols import UniswapV3Factory
+
+    with profiler.phase("build"):
+        sim = build_simulation(synthetic_config(scale, seed), [UniswapV3Factory()])
+    with profiler.phase("run"):
+        sim.run()
+
+
+def _synthetic_trader(name: str, pools: Sequence[Any], seed: int, trade_probability: float = 0.2) -> Any:
+    import numpy as np
+
+    from nqs_sdk import Metrics, RefSharedState, SealedParameters, SimulationClock, TxRequest
+    from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_transactions import RawSwapTransaction
+    from nqs_sdk.interfaces.tx_generator import TxGenerator
+
+    class SyntheticTrader(TxGenerator):
+        """Swaps of log-normal size and random direction on random pools, with a seeded generator."""
+
+        def __init__(self) -> None:
+            super().__init__()
+            self.rng = np.random.default_rng(seed)
+
+        @property
+        def factory_id(self) -> str:
+            return "uniswap_v3"
+
+        def id(self) -> str:
+            return name
+
+        def initialize(self, parameters: SealedParameters) -> None:
+            return
+
+        def next(
+            self, clock: SimulationClock, state: RefSharedState, metrics: Metrics
+        ) -> Tuple[List[TxRequest], Optional[int]]:
+            if self.rng.random() >= trade_probability:
+                return [], None
+            index = int(self.rng.integers(len(pools)))
+            zero_for_one = bool(self.rng.random() < 0.5)
+            token0, token1, _ = pool_params(index)
+            decimals, size = TOKENS[token0 if zero_for_one else token1]
+            amount = int(size * self.rng.lognormal(0.0, 1.0) * 10**decimals)
+            tx = RawSwapTransaction(amount=amount, zero_for_one=zero_for_one, sqrt_price_limit_x96=None)
+            return [tx.to_tx_request(pools[index].name, name, state.agent_name_to_addr(name))], None
+
+    return SyntheticTrader()
+
+
+def run_env_builder(profiler: Profiler, scale: Scale, seed: int) -> None:
+    with profiler.phase("import"):
+        from nqs_sdk.bindings.env_builder import SimulatorEnvBuilder
+        from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_factory import UniswapV3Factory
+
+    with profiler.phase("build"):
+        pools = [_custom_pool(i) for i in range(scale.pools)]
+        env_builder = SimulatorEnvBuilder()
+        env_builder.register_factory(UniswapV3Factory())
+        for pool in pools:
+            env_builder.register_protocol(pool)
+        wallet = {token: size * 1_000 for token, (_, size) in TOKENS.items()}
+        for i in range(scale.agents):
+            name = f"bench_trader_{i}"
+            env_builder.register_agent(name, dict(wallet))
+            trader = profiler.instrument(_synthetic_trader(name, pools, seed + i), "next", prefix="trader")
+            env_builder.register_tx_generator(trader)
+        env_builder.set_simulator_time(START_BLOCK, START_BLOCK + scale.blocks - 1, 1)
+        env_builder.set_numeraire("USDC")
+        simulation = env_builder.build()
+
+    with profiler.phase("run"):
+        for _ in simulation:
+            pass
+
+
+def run_coding_env(profiler: Profiler, scale: Scale, seed: int) -> None:
+    with profiler.phase("import"):
+        import numpy as np
+        from population import AgentPopulation
+
+        from nqs_sdk.coding_envs.coding_env import CodingEnv
+        from nqs_sdk.coding_envs.protocols.uniswap_v3.uniswap_v3_coding_env import UniswapV3CodingProtocol
+
+    with profiler.phase("build"):
+        env = CodingEnv(do_backtest=False)
+        range_pct = np.random.default_rng(seed).uniform(0.001, 0.05, scale.agents)
+        for i in range(scale.pools):
+            pool = _custom_pool(i)
+            env.register_protocol(UniswapV3CodingProtocol(pool))
+            # custom pools keep the token order they are created with, which is the order mint takes its amounts in
+            token0, token1, _ = pool_params(i)
+            population = AgentPopulation(f"bench_lp_{i}", pool.name, (token0, token1), range_pct[i :: scale.pools])
+            population.register(env, {token0: TOKENS[token0][1] * 10, token1: TOKENS[token1][1] * 10})
+        env.set_simulation_time(START_BLOCK, START_BLOCK + scale.blocks - 1, 1)  # FIXME NOT TIME; BLOCK NUMBERS
+        env.set_numeraire("USDC")
+        env.set_gas_fee(0, "USDC")
+
+    with profiler.phase("run"):
+        env.run()
+
+
+SCENARIOS: Dict[str, Callable[[Profiler, Scale, int], None]] = {
+    "config_file": run_config_file,
+    "env_builder": run_env_builder,
+    "coding_env": run_coding_env,
+}
+
+
+@dataclass
+class BenchmarkResult:
+    scenario: str
+    scale: Scale
+    blocks_per_s: float = 0.0
+    startup_s: float = 0.0
+    run_s: float = 0.0
+    peak_rss_bytes: Optional[int] = None
+    phases: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def id(self) -> str:
+        return f"{self.scenario}/{self.scale.name}"
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # bytes on macOS, kilobytes on Linux
+
+
+def _run_in_process(scenario: str, scale: Scale, seed: int, connection: Any) -> None:
+    workdir = tempfile.mkdtemp(prefix="nqs_bench_")
+    try:
+        offline_config = os.path.join(workdir, "offline-quantlib.toml")
+        with open(offline_config, "w") as f:
+            f.write(OFFLINE_QUANTLIB_CONFIG)
+        os.environ["QUANTLIB_CONFIG"] = offline_config
+        os.environ["QUANTLIB_CACHE"] = os.path.join(workdir, "cache")
+
+        with Profiler() as profiler:
+            SCENARIOS[scenario](profiler, scale, seed)
+        phases = profiler.report()["phases"]
+        run_s = phases["run"]["total_s"]
+        connection.send(
+            BenchmarkResult(
+                scenario,
+                scale,
+                blocks_per_s=scale.blocks / run_s if run_s else 0.0,
+                startup_s=phases["import"]["total_s"] + phases["build"]["total_s"],
+                run_s=run_s,
+                peak_rss_bytes=_peak_rss_bytes(),
+                phases=phases,
+            )
+        )
+    except BaseException:
+        connection.send(BenchmarkResult(scenario, scale, error=traceback.format_exc()))
+    finally:
+        connection.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_benchmark(scenario: str, scale: Scale, seed: int = 0, timeout: Optional[float] = None) -> BenchmarkResult:
+    """Run one scenario at one scale in a fresh process."""
+    context = multiprocessing.get_context("spawn")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_run_in_process, args=(scenario, scale, seed, sender), daemon=True)
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            process.kill()
+            return BenchmarkResult(scenario, scale, error=f"Timed out after {timeout}s")
+        return receiver.recv()
+    except EOFError:
+        return BenchmarkResult(scenario, scale, error=f"Benchmark process died with exit code {process.exitcode}")
+    finally:
+        process.join()
+
+
+def run_suite(
+    scenarios: Sequence[str],
+    scales: Sequence[Scale],
+    repeat: int = 3,
+    seed: int = 0,
+    timeout: Optional[float] = None,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None,
+) -> List[BenchmarkResult]:
+    """
+    Run every scenario at every scale `repeat` times, keeping the run with the median throughput.
+
+    A failed run fails the benchmark.
+    """
+    results = []
+    for scale in scales:
+        for scenario in scenarios:
+            runs = [run_benchmark(scenario, scale, seed, timeout) for _ in range(repeat)]
+            failed = [run for run in runs if not run.ok]
+            if failed:
+                result = failed[0]
+            else:
+                runs.sort(key=lambda run: run.blocks_per_s)
+                result = runs[len(runs) // 2]
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        from importlib.metadata import version
+
+        nqs_sdk_version = version("nqs_sdk")
+    except Exception:
+        nqs_sdk_version = "unknown"
+    return {
+        "nqs_sdk": nqs_sdk_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "created_at": time.time(),
+    }
+
+
+def save_results(path: str, results: Sequence[BenchmarkResult]) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "format_version": BASELINE_FORMAT_VERSION,
+                "environment": environment(),
+                "benchmarks": {result.id: asdict(result) for result in results},
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("format_version") != BASELINE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported baseline format {data.get('format_version')!r} in {path}")
+    benchmarks: Dict[str, Dict[str, Any]] = data["benchmarks"]
+    return benchmarks
+
+
+# metric name -> True if higher is better
+METRICS = {"blocks_per_s": True, "startup_s": False, "peak_rss_bytes": False}
+
+
+@dataclass
+class Regression:
+    benchmark: str
+    metric: str
+    baseline: Any
+    current: Any
+
+    def __str__(self) -> str:
+        if self.metric == "error":
+            return f"{self.benchmark}: failed ({str(self.current).strip().splitlines()[-1]})"
+        change = self.current / self.baseline - 1 if self.baseline else float("inf")
+        return f"{self.benchmark}: {self.metric} {self.baseline:,.3f} -> {self.current:,.3f} ({change:+.1%})"
+
+
+def compare(
+    results: Sequence[BenchmarkResult], baseline: Mapping[str, Mapping[str, Any]], tolerance: float = 0.15
+) -> List[Regression]:
+    """
+    Regressions of `results` against a baseline: benchmarks that now fail, or whose metrics are worse by more than
+    `tolerance` (a fraction). Benchmarks missing from the baseline are not compared.
+    """
+    regressions = []
+    for result in results:
+        reference = baseline.get(result.id)
+        if reference is None or reference.get("error") is not None:
+            continue
+        if not result.ok:
+            regressions.append(Regression(result.id, "error", None, result.error))
+            continue
+        for metric, higher_is_better in METRICS.items():
+            before, after = reference.get(metric), getattr(result, metric)
+            if before is None or after is None:
+                continue
+            worse = after < before * (1 - tolerance) if higher_is_better else after > before * (1 + tolerance)
+            if worse:
+                regressions.append(Regression(result.id, metric, before, after))
+    return regressions
@@ -0,0 +1,207 @@
+"""
+Offline historical data bundles.
+
+A bundle is a single versioned file holding everything a backtest over a given set of pools and block ranges pulls
+from the data service: historical pool states, pool events and spot series. It is built by replaying the backtest
+once with the quantlib cache pointed at an empty directory, then packing that cache together with a manifest.
+
+Opening a bundle extracts it once per machine (keyed by its manifest hash), checks the extracted files against the
+hashes of the manifest, and points `QUANTLIB_CACHE` at it for the duration of a `with open_bundle(...)` block. With
+`offline=True`, `QUANTLIB_CONFIG` is also pointed at an unreachable proxy so that any query missing from the bundle
+fails immediately instead of silently reaching the network, which is what air-gapped CI nodes need:
+
+    with open_bundle("usdc_usdt.bundle", pools, (start_block, end_block)):
+        ...  # build and run simulations
+
+A requested block range is accepted when one of the prefetched ranges contains it. Whether each query of a backtest
+over a sub-range is found in the cache depends on how the data service splits its queries; in offline mode a miss
+fails loudly, so build bundles with the ranges your backtests use (e.g. one range per day) where possible.
+"""
+
+import errno
+import hashlib
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+CACHE_DIR_NAME = "cache"
+OFFLINE_QUANTLIB_CONFIG = '[proxy]\nurl = "http://127.0.0.1:9/graphql"\napi-key = "offline"\n'
+
+
+@dataclass
+class BundleManifest:
+    pools: Dict[str, str]
+    block_ranges: List[Tuple[int, int]]
+    nqs_sdk_version: str
+    format_version: int = BUNDLE_FORMAT_VERSION
+    created_at: float = field(default_factory=time.time)
+    files: Dict[str, str] = field(default_factory=dict)
+
+    def covers(self, pools: Mapping[str, str], start_block: int, end_block: int) -> bool:
+        """Whether all `pools` are bundled and one of the bundled block ranges contains `start_block -> end_block`."""
+        return all(self.pools.get(name) == address for name, address in pools.items()) and any(
+            first <= start_block and end_block <= last for first, last in self.block_ranges
+        )
+
+    def digest(self) -> str:
+        return hashlib.sha256(json.dumps(asdict(self), sort_keys=True).encode()).hexdigest()
+
+
+class BundleError(Exception):
+    pass
+
+
+@contextmanager
+def _environ(**values: str) -> Iterator[None]:
+    """Set environment variables for the duration of the block, then restore their previous values."""
+    previous = {name: os.environ.get(name) for name in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def replay(pools: Mapping[str, str], start_block: int, end_block: int) -> None:
+    """Run a historical replay of `pools` over `start_block -> end_block`, without agents."""
+    from historical import historical_replay_builder
+
+    from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+
+    uniswap_pools = [UniswapV3Pool.from_address(address, start_block) for address in pools.values()]
+    env_builder = historical_replay_builder(uniswap_pools, start_block, end_block)
+    for _ in env_builder.build():
+        pass
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_bundle(path: str, pools: Mapping[str, str], block_ranges: Sequence[Tuple[int, int]]) -> BundleManifest:
+    """Prefetch all data for `pools` over each of `block_ranges` and pack it into the bundle file `path`."""
+    import nqs_sdk
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cache_dir = os.path.join(workdir, CACHE_DIR_NAME)
+        os.makedirs(cache_dir)
+        with _environ(QUANTLIB_CACHE=cache_dir):
+            for start_block, end_block in block_ranges:
+                replay(pools, start_block, end_block)
+
+        manifest = BundleManifest(dict(pools), [tuple(r) for r in block_ranges], nqs_sdk.__version__)
+        for root, _, files in os.walk(cache_dir):
+            for name in sorted(files):
+                file_path = os.path.join(root, name)
+                manifest.files[os.path.relpath(file_path, cache_dir)] = _sha256(file_path)
+
+        # uncompressed, so that extraction is a plain copy
+        with tarfile.open(path, "w") as tar:
+            data = json.dumps(asdict(manifest), indent=2).encode()
+            info = tarfile.TarInfo(MANIFEST_NAME)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+            tar.add(cache_dir, arcname=CACHE_DIR_NAME)
+    return manifest
+
+
+def read_manifest(path: str) -> BundleManifest:
+    with tarfile.open(path, "r") as tar:
+        member = tar.extractfile(MANIFEST_NAME)
+        if member is None:
+            raise BundleError(f"{path} is not a data bundle: missing {MANIFEST_NAME}")
+        manifest = BundleManifest(**json.load(member))
+    if manifest.format_version != BUNDLE_FORMAT_VERSION:
+        raise BundleError(
+            f"{path} has bundle format {manifest.format_version}, this version reads {BUNDLE_FORMAT_VERSION}"
+        )
+    return manifest
+
+
+def verify_files(manifest: BundleManifest, cache_dir: str) -> None:
+    """Raise `BundleError` unless the files under `cache_dir` are exactly the ones of `manifest`, with their hashes."""
+    found = set()
+    for root, _, files in os.walk(cache_dir):
+        for name in files:
+            file_path = os.path.join(root, name)
+            relative = os.path.relpath(file_path, cache_dir)
+            found.add(relative)
+            expected = manifest.files.get(relative)
+            if expected is None:
+                raise BundleError(f"{relative} is not listed in the manifest")
+            if _sha256(file_path) != expected:
+                raise BundleError(f"{relative} does not match its manifest hash")
+    missing = set(manifest.files) - found
+    if missing:
+        raise BundleError(f"{len(missing)} file(s) of the manifest are missing, e.g. {sorted(missing)[0]}")
+
+
+def _extract(path: str, manifest: BundleManifest, cache_root: str) -> str:
+    """Extract and verify the bundle once per `cache_root`; return its cache directory."""
+    target = os.path.join(cache_root, manifest.digest()[:16])
+    if not os.path.exists(target):
+        # extract and verify next to the target then rename, so a partial or corrupt bundle is never used
+        os.makedirs(cache_root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=cache_root)
+        try:
+            with tarfile.open(path, "r") as tar:
+                tar.extractall(staging, filter="data")
+            verify_files(manifest, os.path.join(staging, CACHE_DIR_NAME))
+            try:
+                os.rename(staging, target)
+            except OSError as e:
+                # only a target extracted concurrently by another process is expected here
+                if e.errno not in (errno.EEXIST, errno.ENOTEMPTY) or not os.path.isdir(target):
+                    raise
+        except (BundleError, tarfile.TarError) as e:
+            raise BundleError(f"{path} is corrupt: {e}") from e
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    return os.path.join(target, CACHE_DIR_NAME)
+
+
+@contextmanager
+def open_bundle(
+    path: str,
+    pools: Optional[Mapping[str, str]] = None,
+    block_range: Optional[Tuple[int, int]] = None,
+    cache_root: Optional[str] = None,
+    offline: bool = True,
+) -> Iterator[BundleManifest]:
+    """
+    Make the bundle at `path` the data source of the simulations built inside the `with` block.
+
+    `QUANTLIB_CACHE` (and `QUANTLIB_CONFIG` with `offline=True`) are restored on exit. When `pools` and `block_range`
+    are given, the bundle is checked to cover them.
+    """
+    manifest = read_manifest(path)
+    if pools is not None and block_range is not None and not manifest.covers(pools, *block_range):
+        raise BundleError(f"{path} does not cover pools {dict(pools)} over blocks {block_range}")
+
+    cache_dir = _extract(path, manifest, cache_root or os.path.join(tempfile.gettempdir(), "nqs_bundles"))
+    environ = {"QUANTLIB_CACHE": cache_dir}
+    if offline:
+        offline_config = os.path.join(os.path.dirname(cache_dir), "offline-quantlib.toml")
+        with open(offline_config, "w") as f:
+            f.write(OFFLINE_QUANTLIB_CONFIG)
+        environ["QUANTLIB_CONFIG"] = offline_config
+    with _environ(**environ):
+        yield manifest
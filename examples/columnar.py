@@ -0,0 +1,162 @@
+"""
+Columnar views over simulation results.
+
+`Simulation.run()` and `run_to_dict()` return one entry per observable key, each holding a Python list of boxed
+values. This module converts such results into one contiguous float64 buffer per observable, a shared block index
+and pre-parsed metric key columns, so that the data can be handed to NumPy, Arrow or pandas without further copies.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# one label: `name="value"`, `name=value` or `"value"`; quoted values may contain commas and escaped quotes
+_LABEL_RE = re.compile(
+    r'\s*(?:(?P<name>[A-Za-z_][A-Za-z0-9_]*)\s*=\s*)?(?:"(?P<quoted>(?:[^"\\]|\\.)*)"|(?P<bare>[^,"]*?))\s*(?:,|$)'
+)
+
+
+@dataclass(frozen=True)
+class MetricKey:
+    """Parsed form of an observable key such as `agent_1.all.wallet_holdings:{token="USDC"}`."""
+
+    raw: str
+    agent: Optional[str]
+    protocol: str
+    metric: str
+    labels: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def parse(cls, raw: str) -> "MetricKey":
+        """Parse `raw`; keys that do not follow the usual layout are kept with their raw path as metric."""
+        path, _, labels = raw.partition(":")
+        parts = path.split(".")
+        if len(parts) < 2:
+            agent, protocol, metric = None, "", path
+        elif len(parts) == 2:
+            agent, protocol, metric = None, parts[0], parts[1]
+        else:
+            agent, protocol, metric = parts[0], parts[1], ".".join(parts[2:])
+        return cls(raw, agent, protocol, metric, _parse_labels(labels))
+
+    @property
+    def labels_str(self) -> str:
+        return ",".join(f"{name}={value}" if name else value for name, value in self.labels)
+
+
+def _parse_labels(labels: str) -> Tuple[Tuple[str, str], ...]:
+    """Labels as `(name, value)` pairs; labels that cannot be parsed are kept as one unnamed raw value."""
+    labels = labels.strip()
+    if not labels:
+        return ()
+    if not (labels.startswith("{") and labels.endswith("}")):
+        return (("", labels),)
+    body, position, parsed = labels[1:-1], 0, []
+    while position < len(body):
+        match = _LABEL_RE.match(body, position)
+        if match is None or match.end() == position:
+            return (("", labels),)
+        quoted = match.group("quoted")
+        value = re.sub(r"\\(.)", r"\1", quoted) if quoted is not None else match.group("bare")
+        parsed.append((match.group("name") or "", value))
+        position = match.end()
+    return tuple(parsed)
+
+
+def _to_float64(values: Sequence[Any]) -> np.ndarray:
+    return np.fromiter((np.nan if v is None else float(v) for v in values), dtype=np.float64, count=len(values))
+
+
+@dataclass
+class ColumnarResults:
+    """One contiguous float64 column per observable, aligned on a shared block index."""
+
+    index: np.ndarray
+    keys: List[MetricKey] = field(default_factory=list)
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, results: Mapping[str, Any], index: Optional[Sequence[int]] = None) -> "ColumnarResults":
+        """
+        Build from the output of `Simulation.run()` or `run_to_dict()`.
+
+        The values of each observable are converted in a single pass, without an intermediate list. When `index` is
+        omitted, rows are numbered from 0.
+        """
+        keys: List[MetricKey] = []
+        columns: Dict[str, np.ndarray] = {}
+        n_rows: Optional[int] = None
+        for raw, entry in results.items():
+            values = entry["values"] if isinstance(entry, Mapping) else entry
+            column = _to_float64(values)
+            if n_rows is None:
+                n_rows = len(column)
+            elif len(column) != n_rows:
+                raise ValueError(f"Observable {raw!r} has {len(column)} values, expected {n_rows}")
+            keys.append(MetricKey.parse(raw))
+            columns[raw] = column
+
+        n_rows = n_rows or 0
+        block_index = np.arange(n_rows, dtype=np.int64) if index is None else np.asarray(index, dtype=np.int64)
+        if len(block_index) != n_rows:
+            raise ValueError(f"Index has {len(block_index)} entries, expected {n_rows}")
+        return cls(block_index, keys, columns)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def select(
+        self, agent: Optional[str] = None, protocol: Optional[str] = None, metric: Optional[str] = None
+    ) -> Dict[str, np.ndarray]:
+        """Return the columns whose parsed key matches all given fields."""
+        return {
+            key.raw: self.columns[key.raw]
+            for key in self.keys
+            if (agent is None or key.agent == agent)
+            and (protocol is None or key.protocol == protocol)
+            and (metric is None or key.metric == metric)
+        }
+
+    def key_columns(self) -> Dict[str, np.ndarray]:
+        """Parsed metric keys as columns: key, agent, protocol, metric, labels."""
+        return {
+            "key": np.array([key.raw for key in self.keys], dtype=object),
+            "agent": np.array([key.agent for key in self.keys], dtype=object),
+            "protocol": np.array([key.protocol for key in self.keys], dtype=object),
+            "metric": np.array([key.metric for key in self.keys], dtype=object),
+            "labels": np.array([key.labels_str for key in self.keys], dtype=object),
+        }
+
+    def to_arrow(self) -> Tuple[Any, Any]:
+        """
+        Return `(values, keys)` Arrow tables.
+
+        `values` has a `block` column followed by one float64 column per observable; the underlying NumPy buffers are
+        wrapped without copying. `keys` holds the parsed metric key columns.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required for Arrow output: pip install pyarrow") from e
+
+        values = pa.table({"block": self.index, **self.columns})
+        keys = pa.table({name: pa.array(col.tolist(), type=pa.string()) for name, col in self.key_columns().items()})
+        return values, keys
+
+
+def row_count(results: Mapping[str, Any]) -> int:
+    """Number of rows of the output of `Simulation.run()` or `run_to_dict()`, from its first observable."""
+    for entry in results.values():
+        return len(entry["values"] if isinstance(entry, Mapping) else entry)
+    return 0
+
+
+def block_index(common: Mapping[str, Any], n_rows: int) -> np.ndarray:
+    """Block numbers of the collected rows, from the `common` section of a block-based config."""
+    start = int(common["block_number_start"])
+    step = int(common.get("block_step_metrics") or 1)
+    return start + step * np.arange(n_rows, dtype=np.int64)
+
@@ -0,0 +1,282 @@
+"""
+Compiled action conditions.
+
+Action conditions are microlanguage strings such as
+`common.market_spot:{"WETH/USDC"} < 2000.2 OR common.market_spot:{"DAI/WETH"} < 1 / 2000.6`.
+`compile_condition` parses such a string once into an expression plan:
+
+- constant sub-expressions are folded (`1 / 2000.6` becomes a single `Decimal`)
+- `AND` / `OR` short-circuit
+- the metrics the condition depends on are known up front, so `CompiledCondition.evaluate` only re-evaluates the plan
+  when one of them changed, and returns the cached result otherwise
+- evaluation counts and timings are kept per condition
+
+`str(condition)` renders the folded plan back to the microlanguage, e.g. to rewrite a config file.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+
+class ConditionSyntaxError(ValueError):
+    pass
+
+
+# dotted metric key with optional labels, e.g. `agent_1.all.wallet_holdings:{token="USDC"}`
+METRIC_PATTERN = r'[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)+(?::\{[^}]*\})?'
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<metric>" + METRIC_PATTERN + r")"
+    r"|(?P<number>(?:[0-9][0-9_]*(?:\.[0-9_]*)?|\.[0-9][0-9_]*)(?:[eE][-+]?[0-9]+)?)"
+    r"|(?P<op><=|>=|==|!=|<|>|\+|-|\*|/|\(|\))"
+    r"|(?P<word>[A-Za-z]+))"
+)
+_KEYWORDS = {"and": "AND", "or": "OR", "not": "NOT"}
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+_ARITHMETIC: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b,
+}
+# binding power of infix operators
+_PRECEDENCE = {"OR": 1, "AND": 2, **dict.fromkeys(_COMPARISONS, 4), "+": 5, "-": 5, "*": 6, "/": 6}
+
+
+def iter_actions(config: Mapping[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Actions of all the timed and continuous events of the agents of `config`."""
+    for agent in config.get("agents") or []:
+        strategy = agent.get("strategy") or {}
+        for event in (strategy.get("timed_events") or []) + (strategy.get("continuous_events") or []):
+            yield from event.get("actions") or []
+
+
+def _tokenize(source: str) -> List[Tuple[str, str]]:
+    tokens, position = [], 0
+    source = source.rstrip()
+    while position < len(source):
+        match = _TOKEN_RE.match(source, position)
+        if match is None or match.end() == position:
+            raise ConditionSyntaxError(f"Unexpected character at {position} in {source!r}")
+        kind = match.lastgroup or ""
+        value = match.group(kind)
+        if kind == "word":
+            if value.lower() not in _KEYWORDS:
+                raise ConditionSyntaxError(f"Unknown keyword {value!r} in {source!r}")
+            kind, value = "op", _KEYWORDS[value.lower()]
+        tokens.append((kind, value))
+        position = match.end()
+    return tokens
+
+
+@dataclass(frozen=True)
+class Node:
+    op: str
+    args: Tuple[Any, ...] = ()
+
+    def __str__(self) -> str:
+        if self.op == "const":
+            return _render_constant(self.args[0])
+        if self.op == "metric":
+            return str(self.args[0])
+        if self.op == "neg":
+            return f"-{_wrap(self.args[0], self)}"
+        if self.op == "NOT":
+            return f"NOT {_wrap(self.args[0], self)}"
+        left, right = self.args
+        return f"{_wrap(left, self)} {self.op} {_wrap(right, self, right_side=True)}"
+
+
+def _render_constant(value: Any) -> str:
+    # the microlanguage has no boolean literals
+    if isinstance(value, bool):
+        return "1 == 1" if value else "1 == 0"
+    return format(value, "f")
+
+
+def _wrap(child: Node, parent: Node, right_side: bool = False) -> str:
+    child_precedence = _PRECEDENCE.get(child.op, 10)
+    if child.op == "const" and isinstance(child.args[0], bool):
+        child_precedence = _PRECEDENCE["=="]
+    parent_precedence = _PRECEDENCE.get(parent.op, 7)
+    if child_precedence < parent_precedence or (right_side and child_precedence == parent_precedence):
+        return f"({child})"
+    return str(child)
+
+
+class _Parser:
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.tokens = _tokenize(source)
+        self.position = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.peek()
+        if token is None:
+            raise ConditionSyntaxError(f"Unexpected end of {self.source!r}")
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.expression(0)
+        token = self.peek()
+        if token is not None:
+            raise ConditionSyntaxError(f"Unexpected {token[1]!r} in {self.source!r}")
+        return node
+
+    def expression(self, min_precedence: int) -> Node:
+        left = self.prefix()
+        while True:
+            token = self.peek()
+            if token is None or token[0] != "op" or token[1] not in _PRECEDENCE:
+                return left
+            precedence = _PRECEDENCE[token[1]]
+            if precedence <= min_precedence:
+                return left
+            self.take()
+            left = _fold(Node(token[1], (left, self.expression(precedence))))
+
+    def prefix(self) -> Node:
+        kind, value = self.take()
+        if kind == "number":
+            return Node("const", (Decimal(value.replace("_", "")),))
+        if kind == "metric":
+            return Node("metric", (value,))
+        if value == "(":
+            node = self.expression(0)
+            if self.take() != ("op", ")"):
+                raise ConditionSyntaxError(f"Missing ')' in {self.source!r}")
+            return node
+        if value == "-":
+            return _fold(Node("neg", (self.expression(_PRECEDENCE["*"]),)))
+        if value == "NOT":
+            return _fold(Node("NOT", (self.expression(_PRECEDENCE["AND"]),)))
+        raise ConditionSyntaxError(f"Unexpected {value!r} in {self.source!r}")
+
+
+def _fold(node: Node) -> Node:
+    """Fold `node` if all its arguments are constants, and simplify AND / OR with a constant side."""
+    if all(arg.op == "const" for arg in node.args):
+        return Node("const", (_evaluate(node, {}),))
+    if node.op in ("AND", "OR"):
+        for constant, other in (node.args, node.args[::-1]):
+            if constant.op == "const":
+                # `x AND true` is x, `x AND false` is false; `x OR true` is true, `x OR false` is x
+                if bool(constant.args[0]) == (node.op == "AND"):
+                    return other
+                return constant
+    return node
+
+
+def _evaluate(node: Node, values: Mapping[str, Any]) -> Any:
+    op, args = node.op, node.args
+    if op == "const":
+        return args[0]
+    if op == "metric":
+        return values[args[0]]
+    if op == "neg":
+        return -_evaluate(args[0], values)
+    if op == "NOT":
+        return not _evaluate(args[0], values)
+    if op == "AND":
+        return bool(_evaluate(args[0], values)) and bool(_evaluate(args[1], values))
+    if op == "OR":
+        return bool(_evaluate(args[0], values)) or bool(_evaluate(args[1], values))
+    left, right = _evaluate(args[0], values), _evaluate(args[1], values)
+    if op in _COMPARISONS:
+        return _COMPARISONS[op](left, right)
+    return _ARITHMETIC[op](left, right)
+
+
+def _decimal(value: Any) -> Decimal:
+    if value is None:
+        raise KeyError("Missing metric value")
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _metrics(node: Node) -> Iterator[str]:
+    if node.op == "metric":
+        yield node.args[0]
+    elif node.op != "const":
+        for arg in node.args:
+            yield from _metrics(arg)
+
+
+@dataclass
+class ConditionStats:
+    evaluations: int = 0
+    skipped: int = 0
+    true: int = 0
+    elapsed: float = 0.0
+
+
+@dataclass
+class CompiledCondition:
+    source: str
+    plan: Node
+    dependencies: Tuple[str, ...]
+    stats: ConditionStats = field(default_factory=ConditionStats)
+    _last_inputs: Optional[Tuple[Any, ...]] = None
+    _last_result: bool = False
+
+    def __str__(self) -> str:
+        return str(self.plan)
+
+    def evaluate(self, values: Mapping[str, Any]) -> bool:
+        """Evaluate against the latest metric `values`; cached until one of the dependencies changes."""
+        inputs = tuple(values.get(name) for name in self.dependencies)
+        if inputs == self._last_inputs:
+            self.stats.skipped += 1
+            return self._last_result
+        start = time.perf_counter()
+        result = bool(_evaluate(self.plan, {name: _decimal(value) for name, value in zip(self.dependencies, inputs)}))
+        self.stats.elapsed += time.perf_counter() - start
+        self.stats.evaluations += 1
+        self.stats.true += result
+        self._last_inputs, self._last_result = inputs, result
+        return result
+
+
+def compile_condition(source: str) -> CompiledCondition:
+    plan = _Parser(source).parse()
+    return CompiledCondition(source, plan, tuple(dict.fromkeys(_metrics(plan))))
+
+
+def compile_config_conditions(config: Mapping[str, Any]) -> Dict[str, CompiledCondition]:
+    """Compiled condition of every action of `config` that has one, keyed by action name."""
+    return {
+        str(action["action_name"]): compile_condition(str(action["condition"]))
+        for action in iter_actions(config)
+        if action.get("condition")
+    }
+
+
+def fold_config_conditions(config: Mapping[str, Any]) -> Set[str]:
+    """
+    Rewrite the conditions of `config` in place with their folded form; return the names of the actions changed.
+
+    Conditions that fold to a constant are left as written.
+    """
+    changed = set()
+    for action in iter_actions(config):
+        if action.get("condition"):
+            condition = compile_condition(str(action["condition"]))
+            if condition.plan.op == "const":
+                continue
+            folded = str(condition)
+            if folded != action["condition"]:
+                action["condition"] = folded
+                changed.add(str(action["action_name"]))
+    return changed
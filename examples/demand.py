@@ -0,0 +1,44 @@
+"""
+Demand-driven observable export.
+
+By default (`collect_all_observables: true`) every step exports every observable of every pool and agent. With
+`collect_all_observables: false`, the engine only exports the observables it selects itself; a config file has no
+field listing which ones, so the selection cannot be driven from Python. This module:
+
+- derives that config with `demand_driven_config`
+- lists the metrics a run depends on with `required_metrics`: the ones referenced by action conditions plus the
+  outputs the caller reads
+- checks with `missing_metrics` that the results of a demand-driven run still hold all of them, so that a run can fall
+  back to the full export when they do not
+"""
+
+import copy
+from typing import Any, Dict, Iterable, Mapping, Set
+
+from conditions import compile_condition, iter_actions
+
+
+def condition_metrics(condition: str) -> Set[str]:
+    """Metric keys referenced by a condition such as `common.market_spot:{"WETH/USDC"} < 2000.2`."""
+    return set(compile_condition(condition).dependencies)
+
+
+def required_metrics(config: Mapping[str, Any], outputs: Iterable[str] = ()) -> Set[str]:
+    """Metrics needed by the conditions of `config` and by the `outputs` the caller reads."""
+    metrics = set(outputs)
+    for action in iter_actions(config):
+        if action.get("condition"):
+            metrics |= condition_metrics(str(action["condition"]))
+    return metrics
+
+
+def demand_driven_config(config: Mapping[str, Any]) -> Dict[str, Any]:
+    """Copy of `config` that only exports the observables selected by the engine at each step."""
+    config = copy.deepcopy(dict(config))
+    config["common"]["collect_all_observables"] = False
+    return config
+
+
+def missing_metrics(results: Mapping[str, Any], metrics: Iterable[str]) -> Set[str]:
+    """Metrics among `metrics` that are not in `results`, the output of `run_to_dict()`."""
+    return {metric for metric in metrics if metric not in results}
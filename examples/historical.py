@@ -0,0 +1,109 @@
+"""
+Historical replays for the lower-level API examples.
+
+`historical_replay_builder` sets up a `SimulatorEnvBuilder` replaying the historical swaps, mints, burns and spots
+of Uniswap V3 pools over a block range. `AgentTransactions` is the transaction generator of an agent whose
+transactions are decided by the Python simulation loop, optionally woken up at the blocks of a `WakeSchedule` only.
+"""
+
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from schedule import WakeSchedule
+
+from nqs_sdk import MetricName, Metrics, RefSharedState, SealedParameters, SimulationClock, TxRequest
+from nqs_sdk.bindings.env_builder import SimulatorEnvBuilder
+from nqs_sdk.bindings.protocols.uniswap_v3.spots.historical_uniswap_pool import HistoricalSpotGenerator
+from nqs_sdk.bindings.protocols.uniswap_v3.tx_generators.univ3_historical_tx_generator import Univ3HistoricalTxGenerator
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_factory import UniswapV3Factory
+from nqs_sdk.bindings.protocols.uniswap_v3.uniswap_v3_pool import UniswapV3Pool
+from nqs_sdk.bindings.tx_generators.abstract_transaction import Transaction
+from nqs_sdk.interfaces.observable_consumer import ObservableConsumer
+from nqs_sdk.interfaces.tx_generator import TxGenerator
+
+
+def historical_replay_builder(
+    uniswap_pools: Sequence[UniswapV3Pool],
+    start_block: int,
+    end_block: int,
+    numeraire: str = "USDC",
+    gas_fee: Optional[float] = None,
+    wrap_tx_generator: Optional[Callable[[TxGenerator], TxGenerator]] = None,
+) -> SimulatorEnvBuilder:
+    """
+    Replay of `uniswap_pools` over `start_block -> end_block`, with the gas fee, if any, in `numeraire`.
+
+    `wrap_tx_generator`, e.g. a profiler instrumenting the generator, is applied to each historical transaction
+    generator before it is registered.
+    """
+    env_builder = SimulatorEnvBuilder()
+    env_builder.register_factory(UniswapV3Factory())
+    for uniswap_pool in uniswap_pools:
+        env_builder.register_protocol(uniswap_pool)
+        tx_generator: TxGenerator = Univ3HistoricalTxGenerator(uniswap_pool)
+        if wrap_tx_generator is not None:
+            tx_generator = wrap_tx_generator(tx_generator)
+        env_builder.register_tx_generator(tx_generator)
+    env_builder.register_spot_generator(HistoricalSpotGenerator(list(uniswap_pools)))
+    env_builder.set_simulator_time(start_block, end_block, 1)
+    env_builder.set_numeraire(numeraire)
+    if gas_fee is not None:
+        env_builder.set_gas_fee(gas_fee, numeraire)
+    return env_builder
+
+
+class AgentTransactions(TxGenerator, ObservableConsumer):
+    """
+    Transactions appended by the simulation loop for an agent, submitted at the next step.
+
+    Without a `schedule`, the agent is called at every block. With one, transactions decided at a wake-up block `d`
+    are submitted at `d + 1` and `next` returns that block as its wake hint. `consume` also returns the next wake-up
+    block when `sparse_metrics` is set; leave it unset when the loop reads `required_metrics` at every block.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        required_metrics: List[str],
+        schedule: Optional[WakeSchedule] = None,
+        sparse_metrics: bool = False,
+    ) -> None:
+        super().__init__()
+        self.txns: List[Tuple[Transaction, UniswapV3Pool]] = []
+        self.agent_name = agent_name
+        self.required_metrics = required_metrics
+        self.schedule = schedule
+        self.sparse_metrics = sparse_metrics
+
+    @property
+    def factory_id(self) -> str:
+        return "uniswap_v3"
+
+    def id(self) -> str:
+        return self.agent_name
+
+    def initialize(self, parameters: SealedParameters) -> None:
+        return
+
+    def consume(self, parameters: SealedParameters, clock: SimulationClock) -> Tuple[List[MetricName], Optional[int]]:
+        metrics_names = [parameters.str_to_metric(metric_name) for metric_name in self.required_metrics]
+        if self.schedule is None or not self.sparse_metrics:
+            return metrics_names, None
+        return metrics_names, self.schedule.peek()
+
+    def append_tx(self, tx: Transaction, uniswap_pool: UniswapV3Pool) -> None:
+        self.txns.append((tx, uniswap_pool))
+
+    def next(
+        self,
+        clock: SimulationClock,
+        state: RefSharedState,
+        metrics: Metrics,
+    ) -> Tuple[List[TxRequest], Optional[int]]:
+        agent_addr = state.agent_name_to_addr(self.agent_name)
+        txns = [raw_tx.to_tx_request(pool.name, self.agent_name, agent_addr) for raw_tx, pool in self.txns]
+        self.txns = []  # clear pending agent transactions
+
+        if self.schedule is None:
+            return txns, None
+        next_decision = self.schedule.peek()
+        return txns, None if next_decision is None else next_decision + 1
@@ -0,0 +1,159 @@
+"""
+Fewer observable reads in `PolicyCaller.policy`.
+
+Coding protocol accessors such as `UniswapV3CodingProtocol.dex_spot()` return the full history of an observable, and
+there is no accessor for the latest value only: every read materialises the history on the bindings side, so a
+policy reading an observable every block still costs O(blocks^2) over a run, which only an accessor for the latest
+value could remove. `ObservableCache` keeps policy code from paying it more than once per observable and block, and
+keeps its own windows incremental:
+
+- `latest(name)` reads an observable at most once per block, and only if the policy asks for it
+- `window(name, n)` returns a read-only NumPy view over the last `n` values, kept in a `storage.RingBuffer`; when it
+  was also requested at the previous step, the current value is appended from `latest(name)`, otherwise the window is
+  refilled from the history in the same single read
+- `window_stats(name, n)` returns the count, mean, standard deviation, min and max of that window, updated in O(1)
+  amortised per block from running sums and monotonic queues instead of being recomputed over the window
+
+Missing (NaN) values are kept in the window and left out of its statistics. Nothing is read unless the policy asks
+for it. Call `begin_block(block)` at the top of `policy`. `reads` and `hits` count the accessor calls made and avoided.
+"""
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import numpy as np
+from storage import RingBuffer
+
+
+@dataclass(frozen=True)
+class WindowStats:
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+
+
+class _Window:
+    """Last `size` values of an observable, with running sums and min / max queues over its non-missing values."""
+
+    def __init__(self, size: int) -> None:
+        self.ring = RingBuffer(size)
+        self.block: Optional[int] = None  # block of the last value appended
+        self._shift: Optional[float] = None  # sums are taken around the first value, to limit cancellation
+        self._count = 0
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        # (row, value), values increasing for the min queue and decreasing for the max queue
+        self._min: Deque[Tuple[int, float]] = deque()
+        self._max: Deque[Tuple[int, float]] = deque()
+
+    def append(self, block: int, value: float) -> None:
+        ring = self.ring
+        if self._shift is None and value == value:
+            self._shift = value
+        shift = self._shift or 0.0
+        if len(ring) == ring.capacity:
+            evicted = float(ring.tail(ring.capacity)[1][0])
+            if evicted == evicted:
+                self._count -= 1
+                self._sum -= evicted - shift
+                self._sum_squares -= (evicted - shift) ** 2
+        row = ring.rows
+        ring.append(block, value)
+        self.block = block
+
+        if value == value:
+            self._count += 1
+            self._sum += value - shift
+            self._sum_squares += (value - shift) ** 2
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((row, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((row, value))
+        oldest = ring.rows - len(ring)
+        for queue in (self._min, self._max):
+            while queue and queue[0][0] < oldest:
+                queue.popleft()
+
+    def stats(self) -> WindowStats:
+        if self._count == 0:
+            return WindowStats(0, math.nan, math.nan, math.nan, math.nan)
+        mean = self._sum / self._count
+        variance = max(self._sum_squares / self._count - mean * mean, 0.0)
+        return WindowStats(
+            self._count, mean + (self._shift or 0.0), math.sqrt(variance), self._min[0][1], self._max[0][1]
+        )
+
+
+class ObservableCache:
+    def __init__(self, protocol: Any) -> None:
+        self.protocol = protocol
+        self.block: int = -1
+        self.previous_block: Optional[int] = None
+        self.reads = 0
+        self.hits = 0
+        self._latest: Dict[str, Any] = {}
+        self._windows: Dict[Tuple[str, int], _Window] = {}
+        self._readers: Dict[str, Callable[[], Any]] = {}
+
+    def _history(self, name: str) -> Any:
+        reader = self._readers.get(name)
+        if reader is None:
+            reader = self._readers[name] = getattr(self.protocol, name)
+        self.reads += 1
+        return reader()
+
+    def begin_block(self, block: int) -> None:
+        """Invalidate the values read during the previous block."""
+        if block == self.block:
+            return
+        self.previous_block = None if self.block < 0 else self.block
+        self.block = block
+        self._latest.clear()
+
+    def latest(self, name: str) -> Any:
+        """Latest value of observable `name`, read lazily and at most once per block."""
+        if name in self._latest:
+            self.hits += 1
+        else:
+            self._latest[name] = self._history(name)[-1]
+        return self._latest[name]
+
+    def _window(self, name: str, n: int) -> _Window:
+        window = self._windows.get((name, n))
+        if window is not None and window.block == self.block:
+            self.hits += 1
+        elif window is not None and window.block is not None and window.block == self.previous_block:
+            window.append(self.block, _to_float(self.latest(name)))
+        else:
+            # first request, or a step was skipped: refill from the history
+            window = self._windows[(name, n)] = _Window(n)
+            history = self._history(name)
+            for value in history[-n:]:
+                window.append(self.block, _to_float(value))
+            if len(history):
+                self._latest.setdefault(name, history[-1])
+        return window
+
+    def window(self, name: str, n: int) -> np.ndarray:
+        """
+        Read-only view over the last `n` values of observable `name`, with fewer values at the start of the run.
+
+        The view is only valid until the next block.
+        """
+        view = self._window(name, n).ring.tail()[1]
+        view.flags.writeable = False
+        return view
+
+    def window_stats(self, name: str, n: int) -> WindowStats:
+        """Statistics of the non-missing values of `window(name, n)`, maintained incrementally."""
+        return self._window(name, n).stats()
+
+
+def _to_float(value: Any) -> float:
+    return math.nan if value is None else float(value)
@@ -0,0 +1,156 @@
+"""
+Parallel execution of independent pools.
+
+Pools that share no agent or condition only interact through the market spots, which every partition
+keeps in full. `partition_config` splits a config into such independent groups of pools (with a union-find over the
+pools each agent acts on or reads in its conditions), and `run_partitioned` runs one simulation per group on the
+parallel sweep runner, then merges their columns into one result.
+
+Agents acting on protocols that are not listed as pools (e.g. Compound V2 markets) are kept with those protocols in
+the first group, as are the agents tied to no pool, such as holders without actions. Metrics shared by all groups,
+such as `common.*`, are taken from the first group. Each group is deterministic for a given seed, but stochastic
+processes draw from one random stream per group, so seeded results differ from the ones of a single unpartitioned run.
+"""
+
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+import numpy as np
+from columnar import ColumnarResults
+from conditions import iter_actions
+from demand import condition_metrics
+from startup import load_config
+from sweep import ProgressCallback, run_sweep
+
+
+# (dotted path of a pool list, pool names in that list)
+PoolList = Tuple[str, List[str]]
+
+
+def _pool_lists(config: Mapping[str, Any]) -> List[PoolList]:
+    pool_lists = []
+    environments = [
+        ("simulation_environment.protocols_to_simulate", config.get("simulation_environment") or {}),
+        ("backtest_environment.protocols_to_replay", config.get("backtest_environment") or {}),
+    ]
+    for prefix, environment in environments:
+        protocols = environment.get(prefix.split(".")[-1]) or {}
+        for protocol_id, protocol in protocols.items():
+            candidates = {
+                f"{protocol_id}.pools": protocol.get("pools"),
+                f"{protocol_id}.random_generation_params.pools": (protocol.get("random_generation_params") or {}).get(
+                    "pools"
+                ),
+            }
+            for state in ("custom_state", "historical_state"):
+                candidates[f"{protocol_id}.initial_state.{state}.pools"] = (
+                    (protocol.get("initial_state") or {}).get(state) or {}
+                ).get("pools")
+            for path, pools in candidates.items():
+                if pools:
+                    pool_lists.append((f"{prefix}.{path}", [str(pool["pool_name"]) for pool in pools]))
+    return pool_lists
+
+
+def _get_path(config: Mapping[str, Any], path: str) -> Any:
+    node: Any = config
+    for part in path.split("."):
+        node = node[part]
+    return node
+
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+
+    def find(self, item: str) -> str:
+        self.parent.setdefault(item, item)
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> None:
+        self.parent[self.find(a)] = self.find(b)
+
+
+def partition_config(config: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Overrides of `config` for each independent group of pools, as `{dotted path: value}` dicts.
+
+    A config with a single group returns one empty override.
+    """
+    pool_lists = _pool_lists(config)
+    pools = list(dict.fromkeys(name for _, names in pool_lists for name in names))
+    agents = list(config.get("agents") or [])
+    agent_names = {str(agent["name"]) for agent in agents}
+    others = "__other_protocols__"  # protocols not listed as pools, e.g. Compound V2 markets
+
+    groups = _UnionFind()
+    uses_others = False
+    for agent in agents:
+        agent_node = f"agent:{agent['name']}"
+        groups.find(agent_node)
+        for action in iter_actions({"agents": [agent]}):
+            protocol_id = str(action["protocol_id"])
+            uses_others = uses_others or protocol_id not in pools
+            groups.union(agent_node, protocol_id if protocol_id in pools else others)
+            metrics = condition_metrics(str(action["condition"])) if action.get("condition") else set()
+            for metric in metrics:
+                owner = metric.split(".")[0]
+                if owner in pools:
+                    groups.union(agent_node, owner)
+                elif owner in agent_names:
+                    groups.union(agent_node, f"agent:{owner}")
+
+    # group roots in order of first appearance, with the one holding the other protocols first
+    roots = list(dict.fromkeys(([groups.find(others)] if uses_others else []) + [groups.find(pool) for pool in pools]))
+    if len(roots) <= 1:
+        return [{}]
+
+    # agents tied to no pool, e.g. holders without actions, go to the first group
+    agent_roots = [groups.find(f"agent:{agent['name']}") for agent in agents]
+    agent_roots = [root if root in roots else roots[0] for root in agent_roots]
+
+    overrides = []
+    for root in roots:
+        override: Dict[str, Any] = {}
+        for path, names in pool_lists:
+            entries = _get_path(config, path)
+            override[path] = [entry for entry, name in zip(entries, names) if groups.find(name) == root]
+        override["agents"] = [agent for agent, agent_root in zip(agents, agent_roots) if agent_root == root]
+        overrides.append(override)
+    return overrides
+
+
+def merge_results(parts: List[ColumnarResults]) -> ColumnarResults:
+    """Merge the columns of partitioned runs; keys present in several parts are taken from the first one."""
+    merged = ColumnarResults(parts[0].index if parts else np.empty(0, dtype=np.int64))
+    for part in parts:
+        if not np.array_equal(part.index, merged.index):
+            raise ValueError("Partitioned runs collected metrics at different blocks")
+        for key in part.keys:
+            if key.raw not in merged.columns:
+                merged.keys.append(key)
+                merged.columns[key.raw] = part.columns[key.raw]
+    return merged
+
+
+def run_partitioned(
+    config: Union[str, Mapping[str, Any]],
+    factories: Optional[Callable[[], List[Any]]] = None,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    start_method: Optional[str] = None,
+) -> Tuple[ColumnarResults, Set[int]]:
+    """
+    Run `config`, a config file path or an already parsed config, as independent groups of pools in parallel; return
+    the merged results and failed groups.
+    """
+    if isinstance(config, str):
+        config = load_config(config)
+    overrides = partition_config(config)
+    sweep = run_sweep(
+        config, overrides, factories, max_workers=max_workers, on_progress=on_progress, start_method=start_method
+    )
+    parts = [sweep.outcomes[index].results for index in sorted(sweep.outcomes)]
+    return merge_results([part for part in parts if part is not None]), set(sweep.failures)
@@ -0,0 +1,219 @@
+"""
+Pre-generated correlated spot paths.
+
+The `gbm` and `ou` processes of the `spot` section are simulated inside each run, step by step. For Monte Carlo
+studies, `generate_paths` draws all paths of all spots in one vectorised batch instead:
+
+- the correlation matrix is factorised once (Cholesky) and applied to all increments with one matrix product
+- `antithetic=True` pairs every path with its mirror image, drawn from the negated increments
+- `quasi_random=True` uses a scrambled Sobol sequence (requires SciPy) instead of pseudo-random numbers
+
+`PathBank` stores the paths as `.npy` files keyed by a hash of the seed and all parameters, and returns them memory
+mapped, so that many simulations and processes share the same paths without regenerating or copying them.
+`custom_spot_config` turns one path into `custom` spots, which any config file run can replay. In a sweep, pass a
+`BankPath` as the `spot` parameter of each variant: it only holds the bank root and the path index, and builds the
+`custom` spots in the worker, from the memory map, when the variant runs.
+
+`gbm` follows `dS = mu S dt + vol S dW`. `ou` reverts the log price to `log(mean)` at rate `reversion` per year, with
+`vol` the volatility of the log price; the rate is not part of the config and defaults to 1. Time steps are blocks
+of `step_seconds` seconds, with `mu` and `vol` annualised.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class SpotProcess:
+    name: str
+    kind: str  # "gbm" or "ou"
+    s0: float
+    vol: float
+    mu: float = 0.0
+    mean: float = 0.0
+    reversion: float = 1.0
+
+    @classmethod
+    def from_config(cls, entry: Mapping[str, Any]) -> Optional["SpotProcess"]:
+        """Process of a `spot_list` entry, or None for entries that are not `gbm` or `ou`."""
+        if entry.get("gbm") is not None:
+            gbm = entry["gbm"]
+            return cls(str(entry["name"]), "gbm", float(gbm["s0"]), float(gbm["vol"]), mu=float(gbm.get("mu", 0.0)))
+        if entry.get("ou") is not None:
+            ou = entry["ou"]
+            s0 = float(ou["s0"])
+            return cls(str(entry["name"]), "ou", s0, float(ou["vol"]), mean=float(ou.get("mean", s0)))
+        return None
+
+
+@dataclass(frozen=True)
+class PathSpec:
+    """All the inputs of a batch of paths; two equal specs always give the same paths."""
+
+    processes: Tuple[SpotProcess, ...]
+    correlation: Tuple[Tuple[float, ...], ...]
+    n_paths: int
+    n_steps: int
+    seed: int = 0
+    step_seconds: float = 12.0
+    antithetic: bool = False
+    quasi_random: bool = False
+
+    @classmethod
+    def from_config(cls, config: Mapping[str, Any], n_paths: int, seed: int = 0, **options: Any) -> "PathSpec":
+        """Spec of the `gbm` and `ou` spots of a config, with one step per block of the simulation."""
+        spot = config.get("spot") or {}
+        entries = spot.get("spot_list") or []
+        selected = [(i, process) for i, entry in enumerate(entries) if (process := SpotProcess.from_config(entry))]
+        if not selected:
+            raise ValueError("The config has no gbm or ou spot")
+        indices = [i for i, _ in selected]
+        correlation = np.asarray(spot.get("correlation") or np.eye(len(entries)), dtype=np.float64)
+        correlation = correlation[np.ix_(indices, indices)]
+        common = config["common"]
+        return cls(
+            processes=tuple(process for _, process in selected),
+            correlation=tuple(tuple(float(c) for c in row) for row in correlation),
+            n_paths=n_paths,
+            n_steps=int(common["block_number_end"]) - int(common["block_number_start"]),
+            seed=seed,
+            **options,
+        )
+
+    def key(self) -> str:
+        encoded = json.dumps(asdict(self), sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()[:16]
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return self.n_paths, len(self.processes), self.n_steps + 1
+
+
+def _normals(spec: PathSpec, n: int) -> np.ndarray:
+    n_spots = len(spec.processes)
+    if spec.quasi_random:
+        from scipy.stats import norm, qmc
+
+        sobol = qmc.Sobol(d=spec.n_steps * n_spots, scramble=True, seed=spec.seed)
+        uniforms = sobol.random(n)
+        return norm.ppf(uniforms).reshape(n, spec.n_steps, n_spots)
+    return np.random.default_rng(spec.seed).standard_normal((n, spec.n_steps, n_spots))
+
+
+def generate_paths(spec: PathSpec, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Paths of shape `(n_paths, n_spots, n_steps + 1)`, written into `out` when given."""
+    if spec.antithetic and spec.n_paths % 2:
+        raise ValueError("Antithetic sampling needs an even number of paths")
+    chol = np.linalg.cholesky(np.asarray(spec.correlation, dtype=np.float64))
+    n_drawn = spec.n_paths // 2 if spec.antithetic else spec.n_paths
+    z = _normals(spec, n_drawn) @ chol.T
+    if spec.antithetic:
+        z = np.concatenate([z, -z])
+
+    dt = spec.step_seconds / SECONDS_PER_YEAR
+    paths = np.empty(spec.shape) if out is None else out
+    for j, process in enumerate(spec.processes):
+        dw = z[:, :, j] * np.sqrt(dt)
+        log_path = np.empty((spec.n_paths, spec.n_steps + 1))
+        log_path[:, 0] = np.log(process.s0)
+        if process.kind == "gbm":
+            np.cumsum((process.mu - process.vol**2 / 2) * dt + process.vol * dw, axis=1, out=log_path[:, 1:])
+            log_path[:, 1:] += log_path[:, :1]
+        else:
+            # exact discretisation of the log-price OU process
+            decay = np.exp(-process.reversion * dt)
+            scale = process.vol * np.sqrt((1 - decay**2) / (2 * process.reversion * dt))
+            log_mean = np.log(process.mean)
+            for t in range(spec.n_steps):
+                log_path[:, t + 1] = log_mean + (log_path[:, t] - log_mean) * decay + scale * dw[:, t]
+        np.exp(log_path, out=paths[:, j, :])
+    return paths
+
+
+class PathBank:
+    """Directory of generated paths, one `<key>.npy` file (and its `<key>.json` spec) per `PathSpec`."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, spec: PathSpec) -> str:
+        return os.path.join(self.root, f"{spec.key()}.npy")
+
+    def get(self, spec: PathSpec) -> np.ndarray:
+        """Read-only memory map of the paths of `spec`, generated on first use."""
+        path = self.path(spec)
+        if not os.path.exists(path):
+            # generate next to the final file, then rename, so concurrent processes never read a partial bank
+            fd, staging = tempfile.mkstemp(suffix=".npy", dir=self.root)
+            os.close(fd)
+            try:
+                paths = np.lib.format.open_memmap(staging, mode="w+", dtype=np.float64, shape=spec.shape)
+                generate_paths(spec, out=paths)
+                paths.flush()
+                del paths
+                with open(os.path.join(self.root, f"{spec.key()}.json"), "w") as f:
+                    json.dump(asdict(spec), f, indent=2)
+                os.replace(staging, path)
+            finally:
+                if os.path.exists(staging):
+                    os.remove(staging)
+        return np.load(path, mmap_mode="r")
+
+
+def custom_spot_config(
+    config: Mapping[str, Any], spec: PathSpec, paths: np.ndarray, start_timestamp: int
+) -> Dict[str, Any]:
+    """
+    `spot` section of `config` with its `gbm` and `ou` spots replaced by the `custom` spots of one path.
+
+    `paths` has shape `(n_spots, n_steps + 1)`, e.g. `bank.get(spec)[i]`; `start_timestamp` is the timestamp of the
+    first block of the simulation. The correlation matrix, if any, is kept for the spots that are not replaced.
+    """
+    timestamps = [int(start_timestamp + t * spec.step_seconds) for t in range(spec.n_steps + 1)]
+    generated = {process.name: j for j, process in enumerate(spec.processes)}
+    spot = config.get("spot") or {}
+    spot_list: List[Dict[str, Any]] = []
+    remaining: List[int] = []
+    for i, entry in enumerate(spot.get("spot_list") or []):
+        j = generated.get(str(entry["name"]))
+        if j is None:
+            spot_list.append(dict(entry))
+            remaining.append(i)
+        else:
+            spot_list.append({"name": entry["name"], "custom": {"timestamps": timestamps, "path": paths[j].tolist()}})
+    section: Dict[str, Any] = {"spot_list": spot_list}
+    if spot.get("correlation") is not None and remaining:
+        correlation = np.asarray(spot["correlation"], dtype=np.float64)[np.ix_(remaining, remaining)]
+        section["correlation"] = correlation.tolist()
+    return section
+
+
+@dataclass(frozen=True)
+class BankPath:
+    """
+    Path `index` of `spec` in the bank at `root`, as a sweep parameter.
+
+    Calling it with a config returns the `spot` section of `custom_spot_config`, read from the memory-mapped bank.
+    """
+
+    root: str
+    spec: PathSpec
+    index: int
+    start_timestamp: int
+
+    def __call__(self, config: Mapping[str, Any]) -> Dict[str, Any]:
+        paths = PathBank(self.root).get(self.spec)
+        return custom_spot_config(config, self.spec, paths[self.index], self.start_timestamp)
+
+    def __str__(self) -> str:
+        return f"{self.spec.key()}[{self.index}]"
@@ -0,0 +1,155 @@
+"""
+Background prefetching of simulation steps.
+
+`Prefetcher` drives a simulation iterator, such as the one returned by `SimulatorEnvBuilder.build()`, on a background
+thread and hands its steps over in chunks through a bounded queue. Data fetching and simulation still run back to
+back inside the producer; what overlaps is the producer advancing the simulation and the consumer processing the
+chunks it already has, up to `queue_depth` chunks ahead. This only pays off when:
+
+- the consumer does substantial work per chunk (writing results, analytics), and
+- one of the two sides releases the GIL while it works (file or network I/O, NumPy kernels, or an engine call that
+  releases it); two pure-Python sides just take turns
+
+Wait times are reported on both sides to tune `chunk_size` and `queue_depth`: a high consumer wait means the consumer
+is idle waiting for the simulation, a high producer wait means the queue is full and the consumer is the bottleneck.
+Compare the wall time with a plain `for out in simulation` loop to see whether prefetching helps at all.
+
+The source iterator is advanced from the background thread. Native objects bound to the thread that created them
+(PyO3 `unsendable` classes) panic when used from another one, and PyO3 raises panics as `PanicException`, which
+derives from `BaseException` directly rather than from `Exception`. When the first step raises such an error, nothing
+was consumed from the source, and `chunks()` falls back to stepping it synchronously on the consumer thread, with
+`stats.background` set to False. Python errors raised by the source are re-raised by `chunks()`.
+
+Running ahead is only valid for consumers that do not feed back into the simulation (recording, sinks, analytics).
+Agents submitting transactions from the loop, as in the lower-level API example, must keep the plain iterator.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Generic, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+
+T = TypeVar("T")
+
+_DONE = object()
+
+# not PyO3 panics, which derive from BaseException directly as well
+_PYTHON_BASE_EXCEPTIONS: Tuple[Type[BaseException], ...] = (Exception, GeneratorExit, KeyboardInterrupt, SystemExit)
+
+
+def _is_native_panic(error: BaseException) -> bool:
+    return not isinstance(error, _PYTHON_BASE_EXCEPTIONS)
+
+
+@dataclass
+class PrefetchStats:
+    chunks: int = 0
+    items: int = 0
+    producer_busy: float = 0.0
+    producer_wait: float = 0.0  # waiting for room in a full queue
+    consumer_wait: float = 0.0  # waiting for the next chunk
+    background: bool = True  # False once the source fell back to synchronous stepping
+
+    def __str__(self) -> str:
+        if not self.background:
+            return f"{self.items} steps in {self.chunks} chunks, stepped synchronously: the source is thread-bound"
+        return (
+            f"{self.items} steps in {self.chunks} chunks; producer busy {self.producer_busy:.3f}s, "
+            f"waited {self.producer_wait:.3f}s on a full queue; consumer waited {self.consumer_wait:.3f}s"
+        )
+
+
+class Prefetcher(Generic[T]):
+    """Iterate over `source` from a background thread, `chunk_size` items at a time, at most `queue_depth` ahead."""
+
+    def __init__(self, source: Iterable[T], chunk_size: int = 64, queue_depth: int = 4) -> None:
+        if chunk_size < 1 or queue_depth < 1:
+            raise ValueError("chunk_size and queue_depth must be at least 1")
+        self.chunk_size = chunk_size
+        self.stats = PrefetchStats()
+        self._iterator = iter(source)
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=queue_depth)
+        self._error: Optional[BaseException] = None
+        self._stepped = False  # whether the background thread took a step from the source
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, name="nqs-prefetch", daemon=True)
+
+    def _put(self, item: object) -> bool:
+        start = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                self.stats.producer_wait += time.perf_counter() - start
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                chunk: List[T] = []
+                for item in self._iterator:
+                    self._stepped = True
+                    chunk.append(item)
+                    if len(chunk) == self.chunk_size:
+                        break
+                self.stats.producer_busy += time.perf_counter() - start
+                if not chunk or not self._put(chunk):
+                    break
+                if len(chunk) < self.chunk_size:
+                    break
+        except BaseException as e:
+            if self._stepped or not _is_native_panic(e):
+                self._error = e
+            else:
+                self.stats.background = False
+        finally:
+            self._put(_DONE)
+
+    def chunks(self) -> Iterator[List[T]]:
+        """Yield the steps of the source in chunks of up to `chunk_size`."""
+        self._thread.start()
+        try:
+            while True:
+                start = time.perf_counter()
+                chunk = self._queue.get()
+                self.stats.consumer_wait += time.perf_counter() - start
+                if chunk is _DONE:
+                    break
+                assert isinstance(chunk, list)
+                self.stats.chunks += 1
+                self.stats.items += len(chunk)
+                yield chunk
+            if self._error is not None:
+                raise self._error
+            if not self.stats.background:
+                yield from self._synchronous_chunks()
+        finally:
+            self.close()
+
+    def _synchronous_chunks(self) -> Iterator[List[T]]:
+        chunk: List[T] = []
+        for item in self._iterator:
+            chunk.append(item)
+            if len(chunk) == self.chunk_size:
+                self.stats.chunks += 1
+                self.stats.items += len(chunk)
+                yield chunk
+                chunk = []
+        if chunk:
+            self.stats.chunks += 1
+            self.stats.items += len(chunk)
+            yield chunk
+
+    def __iter__(self) -> Iterator[T]:
+        for chunk in self.chunks():
+            yield from chunk
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
@@ -0,0 +1,163 @@
+"""
+Vectorised agent populations for the coding environment.
+
+`CodingEnv` calls `PolicyCaller.policy(block, protocols)` once per agent and block. With thousands of agents, calling
+accessors such as `get_wallet_holdings` or `position_bounds` for each of them every block dominates the run time.
+
+`AgentPopulation` registers one lightweight policy per agent but takes all decisions in one vectorised call per block:
+
+- the pool spot shared by all agents is read once per decision, by the first agent called; as `dex_spot()` returns
+  the full history, decisions are taken every `decide_every` blocks and all agents hold in between
+- the population state (position bounds, range widths and wallets) lives in NumPy arrays, updated when agents act
+  rather than read back through per-agent accessors; uncollected fees are the one per-agent observable, refreshed by
+  each agent with an open position every `fees_every` blocks when enabled
+- `decide(block, spot, state)` returns arrays of actions for the whole population; each agent policy then only
+  submits its own mint/burn, and agents without an action return immediately without any accessor call
+
+The engine still calls one policy per agent and block; this keeps each of those calls down to an array lookup.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from nqs_sdk.coding_envs.coding_env import CodingEnv
+from nqs_sdk.coding_envs.policy_caller import PolicyCaller
+from nqs_sdk.coding_envs.protocols.coding_protocol import CodingProtocol
+from nqs_sdk.coding_envs.protocols.uniswap_v3.uniswap_v3_coding_env import UniswapV3CodingProtocol
+
+
+HOLD, MINT, REBALANCE = 0, 1, 2
+
+
+@dataclass
+class PopulationState:
+    """
+    Per-agent state, one entry per agent.
+
+    `wallet` has one column per token, in the order of `AgentPopulation.tokens`, and is exact: a wallet only changes
+    when its agent acts. `fees` holds the uncollected fees of each agent's position in numeraire, as of its last refresh
+    (NaN when not refreshed).
+    """
+
+    has_position: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    range_pct: np.ndarray
+    wallet: np.ndarray
+    fees: np.ndarray
+
+    @classmethod
+    def empty(cls, range_pct: np.ndarray, wallet: Tuple[float, float] = (0.0, 0.0)) -> "PopulationState":
+        n = len(range_pct)
+        return cls(
+            np.zeros(n, dtype=bool),
+            np.full(n, np.nan),
+            np.full(n, np.nan),
+            np.asarray(range_pct, dtype=float),
+            np.tile(np.asarray(wallet, dtype=float), (n, 1)),
+            np.full(n, np.nan),
+        )
+
+
+@dataclass
+class Decisions:
+    """Actions for the whole population: `action` is HOLD, MINT or REBALANCE; bounds are used by MINT / REBALANCE."""
+
+    action: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+class AgentPopulation:
+    """
+    Population of range LP agents on one pool, re-centring their position when the spot leaves their range.
+
+    `tokens` is the pool's `(token0, token1)`, the order in which `UniswapV3CodingProtocol.mint(lower, upper, amount0,
+    amount1, position_id)` takes its amounts. Subclass and override `decide` for other strategies.
+    """
+
+    def __init__(
+        self,
+        name_prefix: str,
+        protocol_name: str,
+        tokens: Tuple[str, str],
+        range_pct: np.ndarray,
+        decide_every: int = 1,
+        fees_every: Optional[int] = None,
+    ) -> None:
+        if decide_every < 1 or (fees_every is not None and fees_every < 1):
+            raise ValueError("decide_every and fees_every must be at least 1")
+        self.names = [f"{name_prefix}_{i}" for i in range(len(range_pct))]
+        self.protocol_name = protocol_name
+        self.tokens = tokens
+        self.decide_every = decide_every
+        self.fees_every = fees_every
+        self.state = PopulationState.empty(range_pct)
+        self.block = -1
+        self._hold = Decisions(np.zeros(len(range_pct), dtype=np.int8), self.state.lower, self.state.upper)
+        self.decisions = self._hold
+        self._blocks_seen = 0
+
+    def register(self, env: CodingEnv, wallet: Mapping[str, float]) -> None:
+        self.state.wallet[:] = [wallet.get(token, 0.0) for token in self.tokens]
+        for index, name in enumerate(self.names):
+            env.register_agent(name, dict(wallet), _PopulationMember(self, index))
+
+    def decide(self, block: int, spot: float, state: PopulationState) -> Decisions:
+        out_of_range = state.has_position & ((spot <= state.lower) | (spot >= state.upper))
+        can_mint = ~state.has_position & (state.wallet > 1).all(axis=1)
+        action = np.select([out_of_range, can_mint], [REBALANCE, MINT], HOLD).astype(np.int8)
+        return Decisions(action, spot * (1 - state.range_pct), spot * (1 + state.range_pct))
+
+    def _begin_block(self, block: int, protocol: UniswapV3CodingProtocol) -> None:
+        self.block = block
+        if self._blocks_seen % self.decide_every == 0:
+            self.decisions = self.decide(block, float(protocol.dex_spot()[-1]), self.state)
+        else:
+            self.decisions = self._hold
+        self._blocks_seen += 1
+
+    def act(self, block: int, index: int, protocols: Dict[str, CodingProtocol]) -> None:
+        protocol = protocols[self.protocol_name]
+        if not isinstance(protocol, UniswapV3CodingProtocol):
+            raise TypeError("AgentPopulation requires a UniswapV3CodingProtocol")
+        if block != self.block:
+            self._begin_block(block, protocol)
+
+        position_id = f"{self.names[index]}_position"
+        if self.fees_every is not None and self.state.has_position[index] and block % self.fees_every == 0:
+            self.state.fees[index] = float(protocol.fees_not_collected()[-1])
+
+        action = self.decisions.action[index]
+        if action == HOLD:
+            return
+
+        amounts = [protocol.get_wallet_holdings(token) for token in self.tokens]
+        if action == REBALANCE:
+            protocol.burn(1.0, position_id)
+            amounts = [
+                amount + protocol.token_amount(token, position_id) for token, amount in zip(self.tokens, amounts)
+            ]
+            self.state.has_position[index] = False
+            self.state.fees[index] = np.nan
+        if any(amount <= 1 for amount in amounts):
+            self.state.wallet[index] = amounts
+            return
+
+        lower, upper = float(self.decisions.lower[index]), float(self.decisions.upper[index])
+        # FIXME -1 hack to avoid overflow in Mint (due to raw conversion)
+        protocol.mint(lower, upper, amounts[0] - 1, amounts[1] - 1, position_id)
+        self.state.has_position[index] = True
+        self.state.lower[index], self.state.upper[index] = lower, upper
+        self.state.wallet[index] = [protocol.get_wallet_holdings(token) for token in self.tokens]
+
+
+class _PopulationMember(PolicyCaller):
+    def __init__(self, population: AgentPopulation, index: int) -> None:
+        self.population = population
+        self.index = index
+
+    def policy(self, block: int, protocols: dict[str, CodingProtocol]) -> None:
+        self.population.act(block, self.index, protocols)
@@ -0,0 +1,138 @@
+"""
+Opt-in profiling of simulation runs.
+
+`Profiler` records wall time, call counts and, optionally, Python allocations (through `tracemalloc`) per phase.
+Phases nest, so that time spent in Python callbacks during an engine step is attributed to the callback and the
+remaining self time of the step to the engine:
+
+- `profiler.phase(name)` times a block of code, e.g. data loading or simulation construction
+- `profiler.iterate(simulation)` times each step of a `SimulatorEnvBuilder.build()` iterator
+- `profiler.instrument(obj, "next", ...)` times methods called back by the engine, such as `TxGenerator.next`,
+  `ObservableConsumer.consume` or `PolicyCaller.policy`
+- `profiler.count(name)` counts events such as observable reads or cache hits
+
+`report()` returns a JSON-serialisable summary meant to be diffed between releases; `write_trace()` writes a Chrome
+trace event file (open it in Perfetto or speedscope for a flame graph) and `write_folded()` folded stacks for
+`flamegraph.pl`.
+"""
+
+import functools
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    total: float = 0.0
+    children: float = 0.0
+    allocated: int = 0
+
+    @property
+    def self_time(self) -> float:
+        return self.total - self.children
+
+
+class Profiler:
+    def __init__(self, track_allocations: bool = False, max_trace_events: int = 1_000_000) -> None:
+        self.track_allocations = track_allocations
+        self.max_trace_events = max_trace_events
+        self.phases: Dict[Tuple[str, ...], PhaseStats] = defaultdict(PhaseStats)
+        self.counters: Dict[str, int] = defaultdict(int)
+        self._stack: List[str] = []
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+
+    def __enter__(self) -> "Profiler":
+        if self.track_allocations:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self.track_allocations:
+            tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        path = tuple(self._stack)
+        allocated = tracemalloc.get_traced_memory()[0] if self.track_allocations else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stats = self.phases[path]
+            stats.calls += 1
+            stats.total += elapsed
+            if self.track_allocations:
+                stats.allocated += max(0, tracemalloc.get_traced_memory()[0] - allocated)
+            if len(path) > 1:
+                self.phases[path[:-1]].children += elapsed
+            if len(self._events) < self.max_trace_events:
+                start_us = (start - self._origin) * 1e6
+                self._events.append({"name": name, "ph": "X", "ts": start_us, "dur": elapsed * 1e6, "pid": 0, "tid": 0})
+            self._stack.pop()
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def iterate(self, simulation: Iterable[Any], name: str = "engine.step") -> Iterator[Any]:
+        """Yield the steps of `simulation`, timing the engine work behind each of them."""
+        iterator = iter(simulation)
+        while True:
+            with self.phase(name):
+                try:
+                    out = next(iterator)
+                except StopIteration:
+                    return
+            yield out
+
+    def instrument(self, obj: Any, *methods: str, prefix: Optional[str] = None) -> Any:
+        """Time the given methods of `obj`, as `<prefix>.<method>`; `prefix` defaults to the class name."""
+        prefix = prefix or type(obj).__name__
+        for method_name in methods:
+            setattr(obj, method_name, self._timed(f"{prefix}.{method_name}", getattr(obj, method_name)))
+        return obj
+
+    def _timed(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(method)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.phase(name):
+                return method(*args, **kwargs)
+
+        return timed
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "phases": {
+                "/".join(path): {
+                    "calls": stats.calls,
+                    "total_s": stats.total,
+                    "self_s": stats.self_time,
+                    "mean_s": stats.total / stats.calls if stats.calls else 0.0,
+                    **({"allocated_bytes": stats.allocated} if self.track_allocations else {}),
+                }
+                for path, stats in sorted(self.phases.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def write_report(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_trace(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self._events, "displayTimeUnit": "ms"}, f)
+
+    def write_folded(self, path: str) -> None:
+        """Folded stacks weighted by self time in microseconds."""
+        with open(path, "w") as f:
+            for stack, stats in sorted(self.phases.items()):
+                f.write(f"{';'.join(stack)} {round(stats.self_time * 1e6)}\n")
@@ -0,0 +1,38 @@
+"""
+Running an in-memory config.
+
+`Simulation` takes the path of a config file. `build_simulation` writes a config dict to a temporary file, builds
+the simulation from it and removes the file; `run_config` also runs it and returns the observables.
+"""
+
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+
+def build_simulation(config: Dict[str, Any], factories: Optional[List[Any]] = None) -> Any:
+    """`Simulation` of `config`, with the Uniswap V3 factory by default."""
+    import yaml
+
+    from nqs_sdk import Simulation
+
+    if factories is None:
+        from nqs_sdk.protocols import UniswapV3Factory
+
+        factories = [UniswapV3Factory()]
+
+    fd, config_path = tempfile.mkstemp(suffix=".yml")
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.safe_dump(config, f)
+        sim = Simulation(factories, config_path)
+    finally:
+        os.remove(config_path)
+    if sim.simulator is None:
+        raise RuntimeError("Simulator is not initialized")
+    return sim
+
+
+def run_config(config: Dict[str, Any], factories: Optional[List[Any]] = None) -> Dict[str, Any]:
+    """Run `config` and return its observables, as `run_to_dict()` does."""
+    return build_simulation(config, factories).simulator.run_to_dict()
@@ -0,0 +1,51 @@
+"""
+Wake-up schedules for sparse agents.
+
+`TxGenerator.next` and `ObservableConsumer.consume` return an optional next wake-up block alongside their output.
+Returning `None` asks to be called again at every block. `WakeSchedule` merges the periodic and one-off wake-ups of an
+agent in a priority queue, so that generators can return an exact hint instead and Python code driving the simulation
+loop can skip the blocks where the agent has nothing to do.
+"""
+
+import heapq
+from typing import List, Optional, Set, Tuple
+
+
+class WakeSchedule:
+    def __init__(self, start_block: int, end_block: int) -> None:
+        self.start_block = start_block
+        self.end_block = end_block
+        # (block, period, name); a period of 0 marks a one-off wake-up
+        self._heap: List[Tuple[int, int, str]] = []
+
+    def every(self, period: int, name: str, first_block: Optional[int] = None) -> "WakeSchedule":
+        """Wake up every `period` blocks, from `first_block` (default: the start block) on."""
+        if period < 1:
+            raise ValueError("period must be at least 1")
+        self._push(self.start_block if first_block is None else first_block, period, name)
+        return self
+
+    def at(self, block: int, name: str) -> "WakeSchedule":
+        """Wake up once at `block`."""
+        self._push(block, 0, name)
+        return self
+
+    def _push(self, block: int, period: int, name: str) -> None:
+        if block < self.start_block:
+            block += -(-(self.start_block - block) // period) * period if period else 0
+        if self.start_block <= block <= self.end_block:
+            heapq.heappush(self._heap, (block, period, name))
+
+    def peek(self) -> Optional[int]:
+        """Next wake-up block, or None once the schedule is exhausted."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, block: int) -> Set[str]:
+        """Names of the wake-ups due at or before `block`; periodic ones are rescheduled after `block`."""
+        due: Set[str] = set()
+        while self._heap and self._heap[0][0] <= block:
+            wake_block, period, name = heapq.heappop(self._heap)
+            due.add(name)
+            if period:
+                self._push(wake_block + (1 + (block - wake_block) // period) * period, period, name)
+        return due
@@ -0,0 +1,187 @@
+"""
+Shadow liquidity positions evaluated against a single replay.
+
+A passive Uniswap V3 position that is small relative to the pool does not change the replayed swaps, so thousands of
+candidate `(price_lower, price_upper)` ranges can be evaluated on one backtest instead of one backtest each.
+`ShadowPositions` holds the candidates as NumPy arrays and is updated with the pool price after every step:
+
+- token amounts follow the vectorised counterpart of `token_amounts_from_liquidity`
+- fees accrue from the swap volume of each step, when given: the positions in range at the end of the step earn
+  `fee * volume` times their share `L / (pool_liquidity + L)` of the active liquidity
+- the net position, in token1, is the value of the token amounts plus the fees earned
+
+Prices are the pool price of token0 in token1, as reported by `dex_spot`. Fees need the swap input volume of each
+step, per token, and the active liquidity of the pool; the volume is not one of the pool observables of a replay, so
+it has to come from the caller's own data. `load_volumes` reads it from a CSV file and checks its units: amounts
+and liquidity are expected in token units, the units of `liquidity` here, and raw on-chain integers are converted
+with the token decimals.
+
+Without volumes, `update` only tracks `price_move_fees0` / `price_move_fees1`: the fees that the net price move of
+each step implies (`L * |sqrt(p1) - sqrt(p0)|` of token1 for a move up through a range of liquidity `L`,
+`L * |1/sqrt(p1) - 1/sqrt(p0)|` of token0 for a move down). Swaps that move the price back and forth within a step
+are not seen, so this is not a fee estimate: on a stable pool, where most of the volume nets out, it is close to 0.
+It is left out of the net position.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+VOLUME_COLUMNS = ("block", "volume0", "volume1", "pool_liquidity")
+RAW_VOLUME_COLUMNS = ("block", "volume0_raw", "volume1_raw", "pool_liquidity_raw")
+
+# block -> (volume0, volume1, pool_liquidity), in token units
+Volumes = Dict[int, Tuple[float, float, float]]
+
+
+def token_amounts_from_liquidity(
+    liquidity: np.ndarray, sqrt_price: float, sqrt_lower: np.ndarray, sqrt_upper: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Token0 and token1 amounts of positions with the given liquidity and square-root price bounds."""
+    sqrt_clipped = np.clip(sqrt_price, sqrt_lower, sqrt_upper)
+    amount0 = liquidity * (1 / sqrt_clipped - 1 / sqrt_upper)
+    amount1 = liquidity * (sqrt_clipped - sqrt_lower)
+    return amount0, amount1
+
+
+def liquidity_for_value(spot: float, lower: np.ndarray, upper: np.ndarray, value: float) -> np.ndarray:
+    """Liquidity of positions worth `value` (in token1) at `spot`, i.e. minted with all of `value`."""
+    unit0, unit1 = token_amounts_from_liquidity(np.ones_like(lower), np.sqrt(spot), np.sqrt(lower), np.sqrt(upper))
+    return value / (unit0 * spot + unit1)
+
+
+class ShadowPositions:
+    """
+    Hypothetical positions on one pool, opened at the first price seen and held until the end of the replay.
+
+    `lower` and `upper` are arrays of price bounds, `fee` the fee rate of the pool (e.g. 0.0005 for a 0.05% pool) and
+    `value` the initial value of every position, in token1.
+    """
+
+    def __init__(self, lower: np.ndarray, upper: np.ndarray, fee: float, value: float) -> None:
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        if self.lower.shape != self.upper.shape or np.any(self.lower >= self.upper):
+            raise ValueError("Bounds must be arrays of the same shape with lower < upper")
+        self.fee = fee
+        self.value = value
+        self._sqrt_lower = np.sqrt(self.lower)
+        self._sqrt_upper = np.sqrt(self.upper)
+        self.liquidity = np.zeros_like(self.lower)
+        self.fees0 = np.zeros_like(self.lower)
+        self.fees1 = np.zeros_like(self.lower)
+        self.price_move_fees0 = np.zeros_like(self.lower)
+        self.price_move_fees1 = np.zeros_like(self.lower)
+        self.volume_steps = 0  # steps with a swap volume
+        self.steps_in_range = np.zeros(self.lower.shape, dtype=np.int64)
+        self.steps = 0
+        self.entry_spot: Optional[float] = None
+        self.spot: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.lower)
+
+    def update(
+        self,
+        spot: float,
+        volume0: Optional[float] = None,
+        volume1: Optional[float] = None,
+        pool_liquidity: Optional[float] = None,
+    ) -> None:
+        """
+        Advance to the pool price `spot` of the next step.
+
+        `volume0` and `volume1` are the swap input amounts of the step in token0 and token1, and `pool_liquidity` the
+        active liquidity of the pool, in the same units as `liquidity`; fees only accrue when all three are given.
+        """
+        in_range = (self.lower <= spot) & (spot < self.upper)
+        if self.spot is None:
+            self.entry_spot = spot
+            self.liquidity = liquidity_for_value(spot, self.lower, self.upper, self.value)
+        else:
+            sqrt_from = np.clip(np.sqrt(self.spot), self._sqrt_lower, self._sqrt_upper)
+            sqrt_to = np.clip(np.sqrt(spot), self._sqrt_lower, self._sqrt_upper)
+            if spot > self.spot:
+                self.price_move_fees1 += self.fee * self.liquidity * (sqrt_to - sqrt_from)
+            elif spot < self.spot:
+                self.price_move_fees0 += self.fee * self.liquidity * (1 / sqrt_to - 1 / sqrt_from)
+            if volume0 is not None and volume1 is not None and pool_liquidity is not None:
+                share = np.where(in_range, self.liquidity / (pool_liquidity + self.liquidity), 0.0)
+                self.fees0 += self.fee * volume0 * share
+                self.fees1 += self.fee * volume1 * share
+                self.volume_steps += 1
+        self.spot = spot
+        self.steps += 1
+        self.steps_in_range += in_range
+
+    def _current_spot(self) -> float:
+        if self.spot is None:
+            raise RuntimeError("No price seen yet")
+        return self.spot
+
+    def token_amounts(self) -> Tuple[np.ndarray, np.ndarray]:
+        sqrt_price = np.sqrt(self._current_spot())
+        return token_amounts_from_liquidity(self.liquidity, sqrt_price, self._sqrt_lower, self._sqrt_upper)
+
+    def net_position(self) -> np.ndarray:
+        """Value of the token amounts and earned fees, in token1 at the current price."""
+        amount0, amount1 = self.token_amounts()
+        return (amount0 + self.fees0) * self._current_spot() + amount1 + self.fees1
+
+    def results(self) -> Dict[str, np.ndarray]:
+        """Per-position columns, e.g. to rank ranges or build a `pyarrow.Table`."""
+        amount0, amount1 = self.token_amounts()
+        net_position = self.net_position()
+        entry_spot = self.entry_spot if self.entry_spot is not None else self._current_spot()
+        hold = self.value * (self._current_spot() / entry_spot + 1) / 2
+        return {
+            "price_lower": self.lower,
+            "price_upper": self.upper,
+            "liquidity": self.liquidity,
+            "amount0": amount0,
+            "amount1": amount1,
+            "fees0": self.fees0,
+            "fees1": self.fees1,
+            "price_move_fees0": self.price_move_fees0,
+            "price_move_fees1": self.price_move_fees1,
+            "net_position": net_position,
+            "pnl": net_position - self.value,
+            "pnl_vs_hold_50_50": net_position - hold,
+            "time_in_range": self.steps_in_range / max(self.steps, 1),
+        }
+
+
+def load_volumes(path: str, decimals: Optional[Tuple[int, int]] = None) -> Volumes:
+    """
+    Swap volumes and active liquidity per block, from a CSV file with a header naming the columns and their units.
+
+    A `block,volume0,volume1,pool_liquidity` header declares token units. A `block,volume0_raw,volume1_raw,
+    pool_liquidity_raw` header declares raw on-chain integers, which are converted with the token `decimals`:
+    amounts are divided by `10**decimals`, and the liquidity by `10**((decimals0 + decimals1) / 2)`, as it scales with
+    the square root of the product of the two amounts.
+    """
+    with open(path) as f:
+        header = tuple(name.strip() for name in f.readline().split(","))
+        rows = np.loadtxt(f, delimiter=",", ndmin=2)
+    if header not in (VOLUME_COLUMNS, RAW_VOLUME_COLUMNS):
+        raise ValueError(
+            f"{path}: unexpected header {','.join(header)}, expected {','.join(VOLUME_COLUMNS)} (token units) or "
+            f"{','.join(RAW_VOLUME_COLUMNS)} (raw integers)"
+        )
+    if rows.size and rows.shape[1] != len(header):
+        raise ValueError(f"{path}: rows have {rows.shape[1]} columns, expected {len(header)}")
+    rows = rows.reshape(-1, len(header))
+    if np.any(rows[:, 1:] < 0):
+        raise ValueError(f"{path}: volumes and liquidity must not be negative")
+    if len(np.unique(rows[:, 0])) != len(rows):
+        raise ValueError(f"{path}: duplicate blocks")
+
+    if header == RAW_VOLUME_COLUMNS:
+        if decimals is None:
+            raise ValueError(f"{path}: raw amounts need the token decimals")
+        if np.any(rows[:, 1:] != np.floor(rows[:, 1:])):
+            raise ValueError(f"{path}: raw amounts must be integers")
+        decimals0, decimals1 = decimals
+        rows = rows / np.array([1.0, 10.0**decimals0, 10.0**decimals1, 10.0 ** ((decimals0 + decimals1) / 2)])
+    return {int(row[0]): (float(row[1]), float(row[2]), float(row[3])) for row in rows}
@@ -0,0 +1,213 @@
+"""
+Streaming metric sink.
+
+`StreamingMetricSink` writes observables to an Arrow IPC stream file while the simulation runs: rows are buffered and
+flushed as one record batch every `buffer_size` rows, so memory stays bounded whatever the run length. Each batch is
+complete on disk once written, so a crashed run leaves a file that `read_partial` reads up to its last flushed batch.
+Parquet is not used as it cannot be read back without the footer written on close.
+
+Metrics can be downsampled individually: with `downsample={key: n}`, the values of `key` are aggregated over buckets of
+`n` rows by a `storage.Bucket`, as in `storage.MetricSpec(bucket=n)`, and the aggregate (`downsample_mode="mean"` or
+`"last"`, ignoring missing values) is written on the last row of each bucket, with nulls in between. The last,
+incomplete bucket is written on the last row when the sink is closed.
+
+The sink plugs into the three ways of running a simulation:
+- `SimulatorEnvBuilder.build()` iterator: `sink.append(out.block, out.observables)` at each step
+- `CodingEnv.run()`: wrap an agent policy with `RecordingPolicy`, which records protocol observables; as coding
+  protocol accessors return full histories, it reads them every `every` blocks and records the values added since
+- `Simulation.run()`: results are only available at the end, `sink.write_results(results, index)` writes them in batches
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from columnar import ColumnarResults
+from storage import Bucket
+
+
+try:
+    import pyarrow as pa
+except ImportError as e:
+    raise ImportError("pyarrow is required for the streaming metric sink: pip install pyarrow") from e
+
+try:
+    from nqs_sdk.coding_envs.policy_caller import PolicyCaller
+except ImportError:  # only `RecordingPolicy` is run by the bindings, the sinks work without them
+    PolicyCaller = object  # type: ignore[misc,assignment]
+
+
+DOWNSAMPLE_MODES = ("last", "mean")
+
+
+class StreamingMetricSink:
+    def __init__(
+        self,
+        path: str,
+        keys: Optional[Sequence[str]] = None,
+        buffer_size: int = 10_000,
+        downsample: Optional[Mapping[str, int]] = None,
+        downsample_mode: str = "mean",
+    ) -> None:
+        if buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        if downsample_mode not in DOWNSAMPLE_MODES:
+            raise ValueError(f"Unsupported downsample_mode {downsample_mode!r}, expected one of {DOWNSAMPLE_MODES}")
+        if any(n < 1 for n in (downsample or {}).values()):
+            raise ValueError("downsample bucket sizes must be at least 1")
+        self.path = path
+        self.keys: Optional[List[str]] = list(keys) if keys is not None else None
+        self.buffer_size = buffer_size
+        self.downsample = dict(downsample or {})
+        self.rows_written = 0
+        self._buckets = {key: Bucket(n, downsample_mode) for key, n in self.downsample.items() if n > 1}
+        self._blocks: List[int] = []
+        self._columns: Dict[str, List[Optional[float]]] = {}
+        self._schema: Optional[pa.Schema] = None
+        self._sink: Optional[Any] = None
+        self._writer: Optional[Any] = None
+
+    def __enter__(self) -> "StreamingMetricSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _open(self, keys: Sequence[str]) -> None:
+        self.keys = list(keys)
+        self._columns = {key: [] for key in self.keys}
+        self._schema = pa.schema([("block", pa.int64())] + [(key, pa.float64()) for key in self.keys])
+        self._sink = pa.OSFile(self.path, "wb")
+        self._writer = pa.ipc.new_stream(self._sink, self._schema)
+
+    def append(self, block: int, observables: Mapping[str, Any]) -> None:
+        """Record one row; only the sink keys are kept (by default, the keys of the first row)."""
+        if self._writer is None:
+            self._open(self.keys if self.keys is not None else list(observables))
+        # flushed before adding a row rather than after, so that the last row stays buffered until `close`
+        if len(self._blocks) >= self.buffer_size:
+            self.flush()
+        self._blocks.append(block)
+        for key, column in self._columns.items():
+            value = observables.get(key)
+            value = None if value is None else float(value)
+            column.append(self._aggregate(key, value))
+
+    def _aggregate(self, key: str, value: Optional[float]) -> Optional[float]:
+        """Value written for `key` on this row: the aggregate on the last row of a bucket, None before it."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return value
+        row = bucket.add(value)
+        return None if row is None else row[0]
+
+    def flush(self) -> None:
+        """Write the buffered rows as one record batch and push it to disk."""
+        if self._writer is None or not self._blocks:
+            return
+        arrays = [pa.array(self._blocks, type=pa.int64())]
+        # NaN values are written as nulls
+        arrays += [pa.array(column, type=pa.float64(), from_pandas=True) for column in self._columns.values()]
+        self._write_batch(arrays)
+        self._blocks = []
+        self._columns = {key: [] for key in self._columns}
+
+    def _write_batch(self, arrays: List[pa.Array]) -> None:
+        assert self._writer is not None and self._sink is not None
+        self._writer.write_batch(pa.record_batch(arrays, schema=self._schema))
+        self._sink.flush()
+        self.rows_written += len(arrays[0])
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        if self._blocks:
+            for key, bucket in self._buckets.items():
+                row = bucket.close()
+                if row is not None and key in self._columns:
+                    self._columns[key][-1] = row[0]
+        self.flush()
+        self._writer.close()
+        self._sink.close()
+        self._writer = None
+
+    def consume(self, simulation: Iterable[Any]) -> None:
+        """Drain a `SimulatorEnvBuilder.build()` iterator into the sink."""
+        for out in simulation:
+            self.append(out.block, out.observables)
+
+    def write_results(self, results: Mapping[str, Any], index: Optional[Sequence[int]] = None) -> None:
+        """Write the output of `Simulation.run()` / `run_to_dict()` in batches of `buffer_size` rows."""
+        columnar = ColumnarResults.from_dict(results, index)
+        if self._writer is None:
+            self._open(self.keys if self.keys is not None else list(columnar.columns))
+        for start in range(0, len(columnar), self.buffer_size):
+            self.flush()
+            chunk = slice(start, start + self.buffer_size)
+            self._blocks = columnar.index[chunk].tolist()
+            for key in self._columns:
+                column = columnar.columns.get(key)
+                values = [None] * len(self._blocks) if column is None else column[chunk].tolist()
+                self._columns[key] = [self._aggregate(key, value) for value in values]
+
+
+class RecordingPolicy(PolicyCaller):
+    """
+    `PolicyCaller` wrapper recording protocol observables before calling the wrapped policy.
+
+    `accessors` maps each protocol name to the accessors to record, e.g. `{"pool": ["dex_spot", "liquidity"]}`;
+    columns are named `<protocol>.<accessor>`. Accessors return the full history of an observable, so each one is only
+    read every `every` blocks, and the values added since the previous read are recorded, one per policy call. Call
+    `flush()` after the run to record the blocks since the last read.
+    """
+
+    def __init__(
+        self,
+        policy: PolicyCaller,
+        sink: StreamingMetricSink,
+        accessors: Mapping[str, Sequence[str]],
+        every: int = 100,
+    ) -> None:
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.policy_caller = policy
+        self.sink = sink
+        self.accessors = accessors
+        self.every = every
+        self._pending: List[int] = []  # blocks not recorded yet
+        self._protocols: Mapping[str, Any] = {}
+
+    def policy(self, block: int, protocols: Mapping[str, Any]) -> None:
+        self._pending.append(block)
+        self._protocols = protocols
+        if len(self._pending) >= self.every:
+            self.flush()
+        self.policy_caller.policy(block, protocols)
+
+    def flush(self) -> None:
+        """Read the accessors once and record the pending blocks."""
+        if not self._pending:
+            return
+        n = len(self._pending)
+        tails = {
+            f"{name}.{accessor}": list(getattr(self._protocols[name], accessor)())[-n:]
+            for name, accessors in self.accessors.items()
+            for accessor in accessors
+        }
+        for row, block in enumerate(self._pending):
+            # a history shorter than the pending blocks is aligned on the latest ones
+            offset = row - n
+            self.sink.append(block, {key: tail[offset] for key, tail in tails.items() if -offset <= len(tail)})
+        self._pending = []
+
+
+def read_partial(path: str) -> pa.Table:
+    """Read a sink file, including one left by a crashed run, up to its last complete batch."""
+    batches = []
+    with pa.OSFile(path, "rb") as source:
+        reader = pa.ipc.open_stream(source)
+        schema = reader.schema
+        try:
+            for batch in reader:
+                batches.append(batch)
+        except (pa.ArrowInvalid, OSError):
+            pass  # truncated batch from an interrupted run
+    return pa.Table.from_batches(batches, schema=schema)
@@ -0,0 +1,100 @@
+"""
+Cheaper repeat startups for short runs.
+
+For runs of a few blocks, most of the wall time is spent before the first step: importing the bindings, parsing and
+validating the config and fetching the initial pool states. This module makes two of these cheaper on repeat:
+
+- `load_config` parses (and optionally validates) a config file once and, when given a `cache_dir`, keeps the result
+  in an on-disk cache keyed by the hash of the file (and of the JSON schema when validating), so later loads, in this
+  or other processes, skip YAML parsing and validation. The cache holds pickles, so only point it at a directory you
+  trust; it is off by default
+- `use_pool_cache` points `QUANTLIB_CACHE` at a persistent directory, so that the data fetched to initialise pools
+  (e.g. by `UniswapV3Pool.from_address(address, block)`) is read from disk by later runs
+
+`load_config` is for Python code that needs the config as a dict, such as sweeps and partitioned runs, or a schema
+check before a run. It does not make `Simulation` start faster: the engine takes a config file path and parses the
+file itself, so hand it the original path rather than loading the config here and writing it back to a file. Use a
+`profiling.Profiler` around each step, in a fresh process, to get the startup-time breakdown.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Any, Dict, Optional
+
+
+CONFIG_CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "nqs_sdk")
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "configs", "schemas", "config_file_schema.json")
+
+
+class ConfigValidationError(ValueError):
+    pass
+
+
+def config_digest(path: str, schema_path: Optional[str] = None) -> str:
+    digest = hashlib.sha256(f"format={CONFIG_CACHE_FORMAT}\n".encode())
+    for file_path in (path, schema_path):
+        if file_path is not None:
+            with open(file_path, "rb") as f:
+                digest.update(f.read())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _parse(path: str) -> Dict[str, Any]:
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path) as f:
+        return yaml.load(f, Loader=loader)
+
+
+def _validate(config: Dict[str, Any], schema_path: str) -> None:
+    import json
+
+    import jsonschema
+
+    with open(schema_path) as f:
+        schema = json.load(f)
+    errors = sorted(jsonschema.Draft7Validator(schema).iter_errors(config), key=lambda e: list(e.absolute_path))
+    if errors:
+        messages = [f"{'.'.join(map(str, error.absolute_path)) or '<root>'}: {error.message}" for error in errors[:10]]
+        raise ConfigValidationError("Invalid config:\n" + "\n".join(messages))
+
+
+def load_config(
+    path: str, cache_dir: Optional[str] = None, validate: bool = False, schema_path: str = SCHEMA_PATH
+) -> Dict[str, Any]:
+    """
+    Parse (and with `validate=True`, validate against the JSON schema, which requires `jsonschema`) a config file.
+
+    With a `cache_dir`, e.g. `DEFAULT_CACHE_DIR`, the result is cached there. Callers get their own copy and may
+    modify it.
+    """
+    digest = config_digest(path, schema_path if validate else None)
+    cached = os.path.join(cache_dir, "configs", f"{digest}.pickle") if cache_dir is not None else None
+    if cached is not None and os.path.exists(cached):
+        with open(cached, "rb") as f:
+            config: Dict[str, Any] = pickle.load(f)
+        return config
+
+    config = _parse(path)
+    if validate:
+        _validate(config, schema_path)
+    if cached is not None:
+        os.makedirs(os.path.dirname(cached), exist_ok=True)
+        fd, staging = tempfile.mkstemp(dir=os.path.dirname(cached))
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(config, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(staging, cached)
+    return config
+
+
+def use_pool_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Point `QUANTLIB_CACHE` at `<cache_dir>/quantlib` unless it is already set; return the cache directory in use."""
+    if "QUANTLIB_CACHE" not in os.environ:
+        os.makedirs(os.path.join(cache_dir, "quantlib"), exist_ok=True)
+        os.environ["QUANTLIB_CACHE"] = os.path.join(cache_dir, "quantlib")
+    return os.environ["QUANTLIB_CACHE"]
@@ -0,0 +1,86 @@
+"""
+Chunked stepping over a simulation iterator.
+
+Iterating `for out in simulation` hands every block over to Python, with the full `out.observables` of the block.
+`Stepper.step_many(n, keys)` advances the simulation up to `n` blocks in one call and returns only the selected
+observables, as one float64 column per key. Stepping stops early at the block where a decision is due, i.e. the
+next wake-up of a `WakeSchedule` shared with the agents' transaction generators, so that the Python loop only runs
+its decision code when there is something to decide:
+
+    stepper = Stepper(env_builder.build(), [dex_spot_key], schedule)
+    while not stepper.done:
+        chunk = stepper.step_many(1000)
+        if chunk.decision_due:
+            ...  # decide from chunk.columns and chunk.last.observables
+
+Observables that are missing from a step are stored as NaN.
+
+This saves Python-side work only, not engine round trips: the engine still produces every step and hands over its
+full `out.observables`, and `step_many` reads the selected keys from them block by block. What is skipped is the
+per-block decision code and the per-block handling of the observables that are not selected.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+from schedule import WakeSchedule
+
+
+@dataclass
+class StepChunk:
+    """Selected observables of consecutive steps, aligned on `blocks`."""
+
+    blocks: np.ndarray
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    last: Any = None  # output of the last step, with all its observables
+    decision_due: bool = False
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+
+class Stepper:
+    def __init__(
+        self, simulation: Iterable[Any], keys: Sequence[str], schedule: Optional[WakeSchedule] = None
+    ) -> None:
+        self.keys = list(keys)
+        self.schedule = schedule
+        self.done = False
+        self._iterator = iter(simulation)
+
+    def step_many(self, n: int, keys: Optional[Sequence[str]] = None) -> StepChunk:
+        """
+        Advance up to `n` steps, stopping after the step at which the schedule is due.
+
+        `keys` overrides the observables selected at construction for this chunk only.
+        """
+        if n < 1:
+            raise ValueError("n must be at least 1")
+        keys = self.keys if keys is None else list(keys)
+        blocks = np.empty(n, dtype=np.int64)
+        columns = {key: np.empty(n, dtype=np.float64) for key in keys}
+        due = self.schedule.peek() if self.schedule is not None else None
+        chunk = StepChunk(blocks, columns)
+
+        size = 0
+        while size < n:
+            try:
+                out = next(self._iterator)
+            except StopIteration:
+                self.done = True
+                break
+            blocks[size] = out.block
+            observables = out.observables
+            for key, column in columns.items():
+                value = observables.get(key)
+                column[size] = np.nan if value is None else float(value)
+            size += 1
+            chunk.last = out
+            if due is not None and out.block >= due:
+                chunk.decision_due = True
+                break
+
+        chunk.blocks = blocks[:size]
+        chunk.columns = {key: column[:size] for key, column in columns.items()}
+        return chunk
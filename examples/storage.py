@@ -0,0 +1,265 @@
+"""
+Compact typed storage of observable histories.
+
+Recording every observable of a run as full-precision values for every block grows with blocks x metrics, which is
+what makes multi-pool, many-agent runs run out of memory. `ObservableStore` records the observables of a run from
+the simulation loop with a storage choice per metric, given as a `MetricSpec`:
+
+- `dtype="float64"`, or `dtype="int64"` with `scale` decimals: fixed-point integers, exact for token amounts with at
+  most `scale` decimals (values that do not fit raise `OverflowError`)
+- `capacity=n`: keep only the last `n` rows in a ring buffer, for metrics that are only read as rolling windows
+- `bucket=k` with `mode="last"`, `"mean"` or `"ohlc"`: downsample on the fly to one row per `k` steps
+
+Missing values (absent from a step, None or NaN) are skipped by the aggregation of a bucket; a row without any value
+is stored as NaN, or as the `MISSING_INT64` sentinel in int64 metrics, and read back as NaN.
+
+Buffers are contiguous NumPy arrays; unbounded ones grow geometrically, ring buffers hold each row twice so that
+their last rows are always one contiguous slice. `memory_report()` gives the bytes held per metric, and
+`history(key)` the recorded blocks and values, in order and decoded to float64. `Bucket` and `RingBuffer` are the
+building blocks, also used by the streaming sinks and the windowed observables.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+MODES = ("last", "mean", "ohlc")
+MISSING_INT64 = np.iinfo(np.int64).min
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+@dataclass(frozen=True)
+class MetricSpec:
+    dtype: str = "float64"
+    scale: int = 0
+    capacity: Optional[int] = None
+    bucket: int = 1
+    mode: str = "last"
+
+    def __post_init__(self) -> None:
+        if self.dtype not in ("float64", "int64"):
+            raise ValueError(f"Unsupported dtype {self.dtype!r}, expected 'float64' or 'int64'")
+        if self.mode not in MODES:
+            raise ValueError(f"Unsupported mode {self.mode!r}, expected one of {MODES}")
+        if self.bucket < 1 or (self.capacity is not None and self.capacity < 1):
+            raise ValueError("bucket and capacity must be at least 1")
+
+    @property
+    def width(self) -> int:
+        return 4 if self.mode == "ohlc" else 1
+
+
+class Bucket:
+    """
+    Running aggregate of one metric over `size` steps, ignoring missing (None or NaN) values.
+
+    `add` returns the row of a complete bucket, `(open, high, low, close)` in `"ohlc"` mode and a 1-tuple otherwise,
+    with None values when the bucket held no value. Integer values are averaged with integer arithmetic.
+    """
+
+    def __init__(self, size: int = 1, mode: str = "last") -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if mode not in MODES:
+            raise ValueError(f"Unsupported mode {mode!r}, expected one of {MODES}")
+        self.size = size
+        self.mode = mode
+        self.reset()
+
+    def reset(self) -> None:
+        self.steps = 0
+        self.count = 0
+        self.total: Any = 0
+        self.first: Any = None
+        self.high: Any = None
+        self.low: Any = None
+        self.last: Any = None
+
+    def add(self, value: Any) -> Optional[Tuple[Any, ...]]:
+        self.steps += 1
+        if value is not None and value == value:
+            if self.count == 0:
+                self.first = self.high = self.low = value
+            else:
+                self.high = max(self.high, value)
+                self.low = min(self.low, value)
+            self.last = value
+            self.total += value
+            self.count += 1
+        return self.close() if self.steps >= self.size else None
+
+    def close(self) -> Optional[Tuple[Any, ...]]:
+        """Row of the steps added since the last complete bucket, even if incomplete; None if there are none."""
+        if self.steps == 0:
+            return None
+        if self.count == 0:
+            row: Tuple[Any, ...] = (None,) * (4 if self.mode == "ohlc" else 1)
+        elif self.mode == "last":
+            row = (self.last,)
+        elif self.mode == "mean":
+            if isinstance(self.total, int):
+                # rounded half up, without going through float
+                row = ((2 * self.total + self.count) // (2 * self.count),)
+            else:
+                row = (self.total / self.count,)
+        else:
+            row = (self.first, self.high, self.low, self.last)
+        self.reset()
+        return row
+
+
+class RingBuffer:
+    """
+    Rows of `width` values with their block, oldest first.
+
+    With a `capacity`, only the last `capacity` rows are kept, each written twice so that the last rows are always one
+    contiguous slice; without, the buffer grows geometrically. `tail(n)` returns views that are only valid until the
+    next `append`.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, width: int = 1, dtype: Any = np.float64) -> None:
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.width = width
+        self.rows = 0  # rows appended, including the ones no longer kept
+        size = 2 * capacity if capacity is not None else 64
+        self._blocks = np.empty(size, dtype=np.int64)
+        self._values = np.empty((size, width) if width > 1 else size, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.rows if self.capacity is None else min(self.rows, self.capacity)
+
+    def append(self, block: int, row: Any) -> None:
+        if self.capacity is None:
+            if self.rows == len(self._blocks):
+                self._blocks = np.resize(self._blocks, 2 * len(self._blocks))
+                self._values = np.resize(self._values, (2 * len(self._values),) + self._values.shape[1:])
+            self._blocks[self.rows] = block
+            self._values[self.rows] = row
+        else:
+            position = self.rows % self.capacity
+            self._blocks[position] = self._blocks[position + self.capacity] = block
+            self._values[position] = self._values[position + self.capacity] = row
+        self.rows += 1
+
+    def tail(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Blocks and values of the last `n` rows (default: all the rows kept), as views."""
+        n = len(self) if n is None else min(n, len(self))
+        if self.capacity is None:
+            end = self.rows
+        else:
+            end = (self.rows - 1) % self.capacity + self.capacity + 1 if self.rows else 0
+        return self._blocks[end - n : end], self._values[end - n : end]
+
+    @property
+    def nbytes(self) -> int:
+        return self._blocks.nbytes + self._values.nbytes
+
+
+class _Series:
+    """Rows of one metric, with the bucket being aggregated kept aside until it is complete."""
+
+    def __init__(self, spec: MetricSpec) -> None:
+        self.spec = spec
+        self._bucket = Bucket(spec.bucket, spec.mode)
+        self._buffer = RingBuffer(spec.capacity, spec.width, np.dtype(spec.dtype))
+        self._block: Optional[int] = None  # last block of the bucket being aggregated
+
+    @property
+    def rows(self) -> int:
+        return self._buffer.rows
+
+    def _encode(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if self.spec.dtype == "float64":
+            return float(value)
+        if isinstance(value, Decimal):
+            if value.is_nan():
+                return None
+            encoded = int(value.scaleb(self.spec.scale).to_integral_value())
+        else:
+            value = float(value)
+            if value != value:
+                return None
+            encoded = round(value * 10**self.spec.scale)
+        if abs(encoded) > _INT64_MAX:
+            raise OverflowError(f"{value} does not fit in int64 with {self.spec.scale} decimals")
+        return encoded
+
+    def append(self, block: int, value: Any) -> None:
+        self._block = block
+        row = self._bucket.add(self._encode(value))
+        if row is not None:
+            self._write(row)
+
+    def flush(self) -> None:
+        """Write the bucket being aggregated, even if incomplete."""
+        row = self._bucket.close()
+        if row is not None:
+            self._write(row)
+
+    def _write(self, row: Tuple[Any, ...]) -> None:
+        missing = np.nan if self.spec.dtype == "float64" else MISSING_INT64
+        row = tuple(missing if value is None else value for value in row)
+        self._buffer.append(self._block, row if self.spec.width > 1 else row[0])
+
+    def history(self) -> Tuple[np.ndarray, np.ndarray]:
+        blocks, values = self._buffer.tail()
+        decoded = values.astype(np.float64)
+        if self.spec.dtype == "int64":
+            decoded[values == MISSING_INT64] = np.nan
+            decoded /= 10**self.spec.scale
+        return blocks.copy(), decoded
+
+    @property
+    def nbytes(self) -> int:
+        return self._buffer.nbytes
+
+
+class ObservableStore:
+    """
+    Histories of the observables listed in `specs`; with a `default` spec, of all the other observables too.
+    """
+
+    def __init__(self, specs: Mapping[str, MetricSpec], default: Optional[MetricSpec] = None) -> None:
+        self.specs = dict(specs)
+        self.default = default
+        self._series: Dict[str, _Series] = {key: _Series(spec) for key, spec in self.specs.items()}
+
+    def append(self, block: int, observables: Mapping[str, Any]) -> None:
+        if self.default is not None:
+            for key in observables:
+                if key not in self._series:
+                    self._series[key] = _Series(self.default)
+        for key, series in self._series.items():
+            series.append(block, observables.get(key))
+
+    def consume(self, simulation: Iterable[Any]) -> None:
+        """Record every step of a `SimulatorEnvBuilder.build()` iterator."""
+        for out in simulation:
+            self.append(out.block, out.observables)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write the incomplete buckets, e.g. at the end of the run."""
+        for series in self._series.values():
+            series.flush()
+
+    def history(self, key: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Blocks and values of `key`, oldest first; OHLC metrics have one `(open, high, low, close)` row per block."""
+        return self._series[key].history()
+
+    def memory_report(self) -> Dict[str, int]:
+        """Bytes held per metric, largest first."""
+        report = {key: series.nbytes for key, series in self._series.items()}
+        return dict(sorted(report.items(), key=lambda item: -item[1]))
+
+    @property
+    def nbytes(self) -> int:
+        return sum(series.nbytes for series in self._series.values())
@@ -0,0 +1,185 @@
+"""
+Parameter sweeps over a base config file.
+
+The base config is parsed once in the parent process and handed to each worker of a process pool when it starts.
+With the "fork" start method, the Linux default up to Python 3.13, workers inherit the parsed config and the already
+imported protocol bindings copy-on-write instead of re-loading them; it is not safe if the parent runs threads, and
+`start_method="spawn"` or `"forkserver"` can be passed instead, at the cost of importing the bindings in each worker
+and requiring the factories, runner and callable parameters to be picklable (module-level functions, not lambdas).
+Each worker converts its results to columns before sending them back, and results are streamed into a `SweepResults`
+store keyed by the variant parameters as soon as each variant completes.
+"""
+
+import copy
+import itertools
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Union
+
+from columnar import ColumnarResults, block_index, row_count
+from runner import run_config
+from startup import load_config
+
+
+# dotted config path -> value; a callable value is called in the worker with the variant config built so far, and
+# replaced by its result, so that large values are built where they are used instead of being sent to the worker
+Params = Dict[str, Any]
+SEED_PATH = "simulation_environment.seed"
+
+
+def set_path(config: Dict[str, Any], path: str, value: Any) -> None:
+    """Set a dotted path such as `spot.spot_list.0.gbm.vol`; integer parts index into lists."""
+    *parents, leaf = path.split(".")
+    node: Any = config
+    for part in parents:
+        node = node[int(part)] if isinstance(node, list) else node.setdefault(part, {})
+    if isinstance(node, list):
+        node[int(leaf)] = value
+    else:
+        node[leaf] = value
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]], seeds: Optional[Sequence[int]] = None) -> List[Params]:
+    """Cartesian product of a `{dotted path: values}` grid, optionally crossed with a list of seeds."""
+    axes = dict(grid)
+    if seeds is not None:
+        axes[SEED_PATH] = list(seeds)
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+@dataclass
+class VariantOutcome:
+    params: Params
+    elapsed: float
+    results: Optional[ColumnarResults] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class SweepResults:
+    """Outcomes of a sweep, keyed by the position of the variant in the sweep."""
+
+    outcomes: Dict[int, VariantOutcome] = field(default_factory=dict)
+
+    def add(self, index: int, outcome: VariantOutcome) -> None:
+        self.outcomes[index] = outcome
+
+    @property
+    def failures(self) -> Dict[int, VariantOutcome]:
+        return {index: outcome for index, outcome in self.outcomes.items() if not outcome.ok}
+
+    def to_arrow(self) -> Any:
+        """
+        One long table of all successful variants: `variant`, one column per parameter, `block`, observables.
+
+        Without any successful variant, the table has no rows and only the `variant` and `block` columns.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("pyarrow is required to export sweep results to Arrow: pip install pyarrow") from e
+
+        tables = []
+        for index in sorted(self.outcomes):
+            outcome = self.outcomes[index]
+            if outcome.results is None:
+                continue
+            values, _ = outcome.results.to_arrow()
+            n_rows = values.num_rows
+            values = values.add_column(0, "variant", pa.array([index] * n_rows, type=pa.int64()))
+            for position, (name, value) in enumerate(outcome.params.items(), start=1):
+                if not isinstance(value, (bool, int, float, str)) and value is not None:
+                    value = str(value)
+                values = values.add_column(position, name, pa.array([value] * n_rows))
+            tables.append(values)
+        if not tables:
+            return pa.table({"variant": pa.array([], type=pa.int64()), "block": pa.array([], type=pa.int64())})
+        return pa.concat_tables(tables, promote_options="default")
+
+
+ProgressCallback = Callable[[int, int, int, VariantOutcome], None]
+Runner = Callable[[Dict[str, Any], Optional[List[Any]]], Mapping[str, Any]]
+
+# set in each worker by `_init_worker`
+_BASE_CONFIG: Dict[str, Any] = {}
+_VARIANTS: List[Params] = []
+_FACTORIES: Optional[Callable[[], List[Any]]] = None
+_RUNNER: Runner = run_config
+
+
+def _init_worker(
+    config: Dict[str, Any], variants: List[Params], factories: Optional[Callable[[], List[Any]]], runner: Runner
+) -> None:
+    global _BASE_CONFIG, _VARIANTS, _FACTORIES, _RUNNER
+
+    _BASE_CONFIG, _VARIANTS, _FACTORIES, _RUNNER = config, variants, factories, runner
+
+
+def _run_variant(index: int) -> VariantOutcome:
+    params = _VARIANTS[index]
+    start = time.perf_counter()
+    try:
+        config = copy.deepcopy(_BASE_CONFIG)
+        for path, value in params.items():
+            set_path(config, path, value(config) if callable(value) else value)
+        observables = _RUNNER(config, None if _FACTORIES is None else _FACTORIES())
+        results = ColumnarResults.from_dict(observables, index=block_index(config["common"], row_count(observables)))
+        return VariantOutcome(params, time.perf_counter() - start, results=results)
+    except Exception:
+        return VariantOutcome(params, time.perf_counter() - start, error=traceback.format_exc())
+
+
+def print_progress(done: int, total: int, index: int, outcome: VariantOutcome) -> None:
+    status = "ok" if outcome.ok else f"FAILED: {(outcome.error or '').strip().splitlines()[-1]}"
+    print(f"[{done}/{total}] variant {index} {outcome.params} ({outcome.elapsed:.2f}s) {status}")
+
+
+def run_sweep(
+    config: Union[str, Mapping[str, Any]],
+    variants: Sequence[Params],
+    factories: Optional[Callable[[], List[Any]]] = None,
+    max_workers: Optional[int] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    start_method: Optional[str] = None,
+    runner: Runner = run_config,
+) -> SweepResults:
+    """
+    Run every variant of `config`, a config file path or an already parsed config, and collect their columnar results.
+
+    `factories` builds the protocol factories of a simulation, by default the Uniswap V3 factory only; `runner` runs
+    a variant config with them and returns its observables, as `run_to_dict()` does. `on_progress`, e.g.
+    `print_progress`, is called in the parent as each variant completes, and `start_method` selects the
+    multiprocessing start method, the platform default if None. A failing variant does not stop the sweep; its
+    traceback is kept in `SweepResults.failures`.
+    """
+    base_config = load_config(config) if isinstance(config, str) else dict(config)
+    variants = list(variants)
+
+    sweep = SweepResults()
+    context = multiprocessing.get_context(start_method)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(base_config, variants, factories, runner),
+    ) as executor:
+        futures = {executor.submit(_run_variant, index): index for index in range(len(variants))}
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            try:
+                outcome = future.result()
+            except Exception:
+                # the worker died without reporting, e.g. a crash in the native engine
+                outcome = VariantOutcome(variants[index], 0.0, error=traceback.format_exc())
+            sweep.add(index, outcome)
+            if on_progress is not None:
+                on_progress(done, len(variants), index, outcome)
+    return sweep
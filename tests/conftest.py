@@ -0,0 +1,6 @@
+import os
+import sys
+
+
+# the helper modules live next to the example scripts, which import them by name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples"))
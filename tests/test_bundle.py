@@ -0,0 +1,104 @@
+import errno
+import io
+import json
+import os
+import shutil
+import tarfile
+from dataclasses import asdict
+
+import pytest
+from bundle import BundleError, BundleManifest, _extract, _sha256, open_bundle, read_manifest
+
+
+POOLS = {"univ3_usdc_usdt": "0x3416cf6c708da44db2624d63ea0aaef7113527c6"}
+
+
+def make_bundle(tmp_path, corrupt: bool = False) -> str:
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "query").write_bytes(b"cached response")
+    manifest = BundleManifest(dict(POOLS), [(100, 200)], "test")
+    manifest.files["query"] = _sha256(str(cache_dir / "query"))
+    if corrupt:
+        (cache_dir / "query").write_bytes(b"tampered response")
+
+    path = str(tmp_path / "test.bundle")
+    with tarfile.open(path, "w") as tar:
+        data = json.dumps(asdict(manifest)).encode()
+        info = tarfile.TarInfo("manifest.json")
+        info.size = len(data)
+        tar.addfile(info, io.BytesIO(data))
+        tar.add(str(cache_dir), arcname="cache")
+    return path
+
+
+@pytest.mark.parametrize(
+    "block_range, covered", [((100, 200), True), ((120, 150), True), ((100, 201), False), ((50, 150), False)]
+)
+def test_covers_sub_ranges(block_range, covered) -> None:
+    manifest = BundleManifest(dict(POOLS), [(100, 200)], "test")
+    assert manifest.covers(POOLS, *block_range) is covered
+    assert not manifest.covers({"other": "0x0"}, 120, 150)
+
+
+def test_open_bundle_restores_environment(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("QUANTLIB_CACHE", "previous")
+    monkeypatch.delenv("QUANTLIB_CONFIG", raising=False)
+    path = make_bundle(tmp_path)
+    with open_bundle(path, POOLS, (120, 150), cache_root=str(tmp_path / "extracted")):
+        assert open(os.path.join(os.environ["QUANTLIB_CACHE"], "query"), "rb").read() == b"cached response"
+        assert os.path.exists(os.environ["QUANTLIB_CONFIG"])
+    assert os.environ["QUANTLIB_CACHE"] == "previous"
+    assert "QUANTLIB_CONFIG" not in os.environ
+
+
+def test_open_bundle_rejects_corrupt_files(tmp_path) -> None:
+    path = make_bundle(tmp_path, corrupt=True)
+    with pytest.raises(BundleError, match="does not match"):
+        with open_bundle(path, cache_root=str(tmp_path / "extracted")):
+            pass
+    assert os.listdir(tmp_path / "extracted") == []
+
+
+def test_open_bundle_rejects_uncovered_range(tmp_path) -> None:
+    path = make_bundle(tmp_path)
+    with pytest.raises(BundleError, match="does not cover"):
+        with open_bundle(path, POOLS, (150, 250), cache_root=str(tmp_path / "extracted")):
+            pass
+
+
+def test_open_bundle_accepts_concurrent_extraction(tmp_path, monkeypatch) -> None:
+    path = make_bundle(tmp_path)
+    rename = os.rename
+
+    def rename_after_other_process(source: str, target: str) -> None:
+        shutil.copytree(source, target)  # the other process wins the race
+        rename(source, target)
+
+    monkeypatch.setattr(os, "rename", rename_after_other_process)
+    with open_bundle(path, cache_root=str(tmp_path / "extracted")):
+        assert open(os.path.join(os.environ["QUANTLIB_CACHE"], "query"), "rb").read() == b"cached response"
+    assert len(os.listdir(tmp_path / "extracted")) == 1
+
+
+def test_open_bundle_raises_other_os_errors(tmp_path, monkeypatch) -> None:
+    path = make_bundle(tmp_path)
+
+    def rename_denied(source: str, target: str) -> None:
+        raise PermissionError(errno.EACCES, "Permission denied")
+
+    monkeypatch.setattr(os, "rename", rename_denied)
+    with pytest.raises(PermissionError):
+        with open_bundle(path, cache_root=str(tmp_path / "extracted")):
+            pass
+    assert os.listdir(tmp_path / "extracted") == []
+
+
+def test_extract_rejects_truncated_archives(tmp_path) -> None:
+    path = make_bundle(tmp_path)
+    manifest = read_manifest(path)
+    with open(path, "r+b") as f:
+        f.truncate(700)  # the manifest was read, the cache files are cut
+    with pytest.raises(BundleError, match="is corrupt"):
+        _extract(path, manifest, str(tmp_path / "extracted"))
+    assert os.listdir(tmp_path / "extracted") == []
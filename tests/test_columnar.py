@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from columnar import ColumnarResults, MetricKey, block_index, row_count
+
+
+@pytest.mark.parametrize(
+    "raw, labels",
+    [
+        ('agent_1.all.wallet_holdings:{token="USDC"}', (("token", "USDC"),)),
+        ('common.market_spot:{"WETH/USDC"}', (("", "WETH/USDC"),)),
+        ("pool.fees:{tick=100}", (("tick", "100"),)),
+        ('pool.fees:{name="a,b", tick=1}', (("name", "a,b"), ("tick", "1"))),
+        ('pool.fees:{name="say \\"hi\\""}', (("name", 'say "hi"'),)),
+        ("pool.fees:{}", ()),
+        ("pool.fees", ()),
+    ],
+)
+def test_parse_labels(raw: str, labels: tuple) -> None:
+    assert MetricKey.parse(raw).labels == labels
+
+
+def test_parse_keeps_unexpected_keys() -> None:
+    key = MetricKey.parse("pool.fees:not_braced")
+    assert (key.protocol, key.metric, key.labels) == ("pool", "fees", (("", "not_braced"),))
+    key = MetricKey.parse("single")
+    assert (key.agent, key.protocol, key.metric) == (None, "", "single")
+
+
+def test_from_dict_with_unusual_keys() -> None:
+    results = ColumnarResults.from_dict({"pool.fees:{tick=100}": [1, None, 3], "odd": {"values": [1, 2, 3]}})
+    assert len(results) == 3
+    np.testing.assert_array_equal(results.columns["pool.fees:{tick=100}"], [1.0, np.nan, 3.0])
+
+
+def test_block_index_passed_to_from_dict() -> None:
+    results = {"a.b": {"values": [1.0, 2.0, 3.0]}, "c.d": [4.0, 5.0, 6.0]}
+    common = {"block_number_start": 100, "block_step_metrics": 10}
+    columnar = ColumnarResults.from_dict(results, index=block_index(common, row_count(results)))
+    np.testing.assert_array_equal(columnar.index, [100, 110, 120])
+    assert row_count({}) == 0
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+import pytest
+from conditions import ConditionSyntaxError, compile_condition, fold_config_conditions
+
+
+SPOT = 'common.market_spot:{"WETH/USDC"}'
+
+
+@pytest.mark.parametrize(
+    "number, value",
+    [("10.", "10"), ("10.5", "10.5"), (".5", "0.5"), ("1e3", "1000"), ("1E+3", "1000"), ("1_000", "1000")],
+)
+def test_numbers(number: str, value: str) -> None:
+    condition = compile_condition(f"{SPOT} < {number}")
+    assert condition.plan.args[1].args[0] == Decimal(value)
+
+
+def test_folds_constant_arithmetic() -> None:
+    condition = compile_condition(f"{SPOT} < 1 / 2 + 1")
+    assert str(condition) == f"{SPOT} < 1.5"
+    assert condition.dependencies == (SPOT,)
+    assert condition.evaluate({SPOT: 1.2}) and not condition.evaluate({SPOT: 2})
+
+
+@pytest.mark.parametrize(
+    "source, folded",
+    [
+        (f"{SPOT} < 2 AND 1 < 2", f"{SPOT} < 2"),
+        (f"{SPOT} < 2 AND 2 < 1", "1 == 0"),
+        (f"{SPOT} < 2 OR NOT 2 < 1", "1 == 1"),
+        (f"{SPOT} < 2 OR 2 < 1", f"{SPOT} < 2"),
+    ],
+)
+def test_folded_booleans_render_in_the_microlanguage(source: str, folded: str) -> None:
+    condition = compile_condition(source)
+    assert str(condition) == folded
+    # the rendered form parses back to the same plan
+    assert compile_condition(str(condition)).plan == condition.plan
+
+
+def test_evaluation_is_cached_until_inputs_change() -> None:
+    condition = compile_condition(f"{SPOT} > 1000 OR common.market_spot:{{\"DAI/WETH\"}} < 1 / 2000.6")
+    values = {SPOT: 2000, 'common.market_spot:{"DAI/WETH"}': 0.0004}
+    assert condition.evaluate(values)
+    assert condition.evaluate(values)
+    assert (condition.stats.evaluations, condition.stats.skipped) == (1, 1)
+
+
+def test_syntax_errors() -> None:
+    with pytest.raises(ConditionSyntaxError):
+        compile_condition(f"{SPOT} < (1")
+    with pytest.raises(ConditionSyntaxError):
+        compile_condition(f"{SPOT} XOR 1")
+
+
+def test_fold_config_conditions_leaves_constant_conditions() -> None:
+    config = {
+        "agents": [
+            {
+                "name": "agent",
+                "strategy": {
+                    "timed_events": [
+                        {
+                            "actions": [
+                                {"action_name": "constant", "condition": "1 < 2"},
+                                {"action_name": "folded", "condition": f"{SPOT} < 10. * 2"},
+                                {"action_name": "unchanged", "condition": f"{SPOT} < 20"},
+                            ]
+                        }
+                    ]
+                },
+            }
+        ]
+    }
+    assert fold_config_conditions(config) == {"folded"}
+    actions = config["agents"][0]["strategy"]["timed_events"][0]["actions"]
+    assert [action["condition"] for action in actions] == ["1 < 2", f"{SPOT} < 20", f"{SPOT} < 20"]
@@ -0,0 +1,55 @@
+import os
+
+import yaml
+from demand import condition_metrics, demand_driven_config, missing_metrics, required_metrics
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "configs", "basic_config.yml")
+
+
+def test_required_metrics_of_basic_config() -> None:
+    with open(CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    assert required_metrics(config, ["agent_1.all.net_position"]) == {
+        'common.market_spot:{"WETH/USDC"}',
+        'common.market_spot:{"DAI/WETH"}',
+        "agent_1.all.net_position",
+    }
+    reduced = demand_driven_config(config)
+    assert reduced["common"]["collect_all_observables"] is False
+    assert "collect_all_observables" not in config["common"]
+
+
+def test_missing_metrics() -> None:
+    assert missing_metrics({"a.b": {}, "c.d": {}}, ["a.b", "e.f"]) == {"e.f"}
+
+
+def test_condition_metrics_are_the_parsed_dependencies_only() -> None:
+    condition = (
+        'agent_1.all.wallet_holdings:{token="USDC"} > 1.5e3 AND NOT (common.market_spot:{"WETH/USDC"} < 2000.2 '
+        'OR agent_1.all.wallet_holdings:{token="USDC"} / 2 == pool.dex_spot)'
+    )
+    assert condition_metrics(condition) == {
+        'agent_1.all.wallet_holdings:{token="USDC"}',
+        'common.market_spot:{"WETH/USDC"}',
+        "pool.dex_spot",
+    }
+    assert condition_metrics("1 < 2") == set()
+
+
+def test_required_metrics_collects_nothing_else() -> None:
+    config = {
+        "agents": [
+            {
+                "name": "agent_1",
+                "strategy": {
+                    "timed_events": [{"actions": [{"action_name": "mint", "condition": "pool.dex_spot > 1"}]}],
+                    "continuous_events": [{"actions": [{"action_name": "swap"}]}],
+                },
+            },
+            {"name": "holder"},
+        ]
+    }
+    assert required_metrics(config) == {"pool.dex_spot"}
+    assert required_metrics(config, ["agent_1.all.net_position"]) == {"pool.dex_spot", "agent_1.all.net_position"}
+    assert demand_driven_config({**config, "common": {}}) == {**config, "common": {"collect_all_observables": False}}
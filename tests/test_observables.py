@@ -0,0 +1,78 @@
+from typing import List
+
+import numpy as np
+import pytest
+from observables import ObservableCache
+
+
+class FakeProtocol:
+    """Accessors returning the full history, as the coding protocols do."""
+
+    def __init__(self) -> None:
+        self.spots: List[float] = []
+        self.calls = 0
+
+    def dex_spot(self) -> List[float]:
+        self.calls += 1
+        return list(self.spots)
+
+
+def test_latest_reads_once_per_block() -> None:
+    protocol = FakeProtocol()
+    cache = ObservableCache(protocol)
+    for block in range(3):
+        protocol.spots.append(float(block))
+        cache.begin_block(block)
+        assert cache.latest("dex_spot") == block
+        assert cache.latest("dex_spot") == block
+    assert (protocol.calls, cache.reads, cache.hits) == (3, 3, 3)
+
+
+def test_window_appends_consecutive_blocks_and_refills_after_gaps() -> None:
+    protocol = FakeProtocol()
+    cache = ObservableCache(protocol)
+    for block in range(10):
+        protocol.spots.append(float(block))
+        cache.begin_block(block)
+        if block in (6, 7):
+            continue  # the policy skips the window on these blocks
+        window = cache.window("dex_spot", 4)
+        np.testing.assert_array_equal(window, protocol.spots[-4:])
+        assert not window.flags.writeable
+    # one read per requested block, none for the skipped ones
+    assert protocol.calls == 8
+
+
+def test_window_not_tracked_without_request() -> None:
+    protocol = FakeProtocol()
+    cache = ObservableCache(protocol)
+    protocol.spots.append(1.0)
+    cache.begin_block(0)
+    cache.window("dex_spot", 2)
+    protocol.spots.append(2.0)
+    cache.begin_block(1)
+    assert protocol.calls == 1
+
+
+def test_window_stats_match_numpy() -> None:
+    rng = np.random.default_rng(0)
+    protocol = FakeProtocol()
+    cache = ObservableCache(protocol)
+    for block in range(200):
+        spot = 2000.0 + rng.normal() if block % 17 else np.nan
+        protocol.spots.append(spot)
+        cache.begin_block(block)
+        if block % 50 in (30, 31):
+            continue  # gaps force a refill
+        stats = cache.window_stats("dex_spot", 20)
+        window = np.array(protocol.spots[-20:])
+        np.testing.assert_array_equal(cache.window("dex_spot", 20), window)
+        assert stats.count == np.count_nonzero(~np.isnan(window))
+        if stats.count == 0:
+            assert np.isnan(stats.mean)
+            continue
+        assert stats.mean == pytest.approx(np.nanmean(window))
+        assert stats.std == pytest.approx(np.nanstd(window), rel=1e-6)
+        assert (stats.min, stats.max) == (np.nanmin(window), np.nanmax(window))
+    # one read per requested block, shared by the window and its statistics
+    assert protocol.calls == 200 - 8
@@ -0,0 +1,44 @@
+from typing import Any, Dict, Optional
+
+from partition import partition_config
+
+
+def agent(name: str, *protocol_ids: str, condition: Optional[str] = None) -> Dict[str, Any]:
+    actions = [
+        {"action_name": "swap", "protocol_id": protocol_id, "condition": condition} for protocol_id in protocol_ids
+    ]
+    return {"name": name, "wallet": {"USDC": 1}, "strategy": {"timed_events": [{"actions": actions}]}}
+
+
+def make_config() -> Dict[str, Any]:
+    pools = [{"pool_name": "pool_a"}, {"pool_name": "pool_b"}]
+    return {
+        "simulation_environment": {
+            "protocols_to_simulate": {"uniswap_v3": {"initial_state": {"custom_state": {"pools": pools}}}}
+        },
+        "agents": [
+            agent("lp_a", "pool_a"),
+            agent("lp_b", "pool_b"),
+            {"name": "holder", "wallet": {"USDC": 1000}},
+        ],
+    }
+
+
+def test_partition_splits_independent_pools() -> None:
+    overrides = partition_config(make_config())
+    path = "simulation_environment.protocols_to_simulate.uniswap_v3.initial_state.custom_state.pools"
+    assert [[pool["pool_name"] for pool in override[path]] for override in overrides] == [["pool_a"], ["pool_b"]]
+
+
+def test_partition_keeps_every_agent() -> None:
+    config = make_config()
+    overrides = partition_config(config)
+    names = sorted(agent["name"] for override in overrides for agent in override["agents"])
+    assert names == sorted(agent["name"] for agent in config["agents"])
+    assert [agent["name"] for agent in overrides[0]["agents"]] == ["lp_a", "holder"]
+
+
+def test_partition_joins_pools_read_in_conditions() -> None:
+    config = make_config()
+    config["agents"][0] = agent("lp_a", "pool_a", condition="pool_b.dex_spot > 1")
+    assert partition_config(config) == [{}]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from paths import BankPath, PathBank, PathSpec, custom_spot_config, generate_paths
+
+
+CONFIG = {
+    "common": {"block_number_start": 100, "block_number_end": 110},
+    "spot": {
+        "spot_list": [
+            {"name": "WETH/USDC", "gbm": {"s0": 2000, "mu": 0.0, "vol": 0.4}},
+            {"name": "USDC/USDT", "historical": None},
+            {"name": "WBTC/USDC", "ou": {"s0": 40000, "mean": 40000, "vol": 0.3}},
+            {"name": "DAI/USDC", "historical": None},
+        ],
+        "correlation": [
+            [1.0, 0.1, 0.2, 0.3],
+            [0.1, 1.0, 0.4, 0.5],
+            [0.2, 0.4, 1.0, 0.6],
+            [0.3, 0.5, 0.6, 1.0],
+        ],
+    },
+}
+
+
+def test_spec_selects_generated_spots() -> None:
+    spec = PathSpec.from_config(CONFIG, n_paths=4, seed=1)
+    assert [process.name for process in spec.processes] == ["WETH/USDC", "WBTC/USDC"]
+    assert spec.correlation == ((1.0, 0.2), (0.2, 1.0))
+    assert generate_paths(spec).shape == spec.shape == (4, 2, 11)
+
+
+def test_antithetic_paths_mirror_each_other() -> None:
+    spec = PathSpec.from_config(CONFIG, n_paths=4, seed=1, antithetic=True)
+    log_returns = np.diff(np.log(generate_paths(spec)[:, 0, :]), axis=1)
+    drift = log_returns.mean()
+    np.testing.assert_allclose(log_returns[:2] - drift, -(log_returns[2:] - drift), atol=1e-12)
+
+
+def test_custom_spot_config_keeps_correlation_of_remaining_spots() -> None:
+    spec = PathSpec.from_config(CONFIG, n_paths=2, seed=1)
+    section = custom_spot_config(CONFIG, spec, generate_paths(spec)[0], start_timestamp=1_000)
+    kinds = [next(key for key in entry if key != "name") for entry in section["spot_list"]]
+    assert kinds == ["custom", "historical", "custom", "historical"]
+    assert section["spot_list"][0]["custom"]["timestamps"][:2] == [1_000, 1_012]
+    assert section["correlation"] == [[1.0, 0.5], [0.5, 1.0]]
+
+
+def test_bank_path_reads_the_bank(tmp_path) -> None:
+    spec = PathSpec.from_config(CONFIG, n_paths=2, seed=3)
+    bank = PathBank(str(tmp_path))
+    paths = bank.get(spec)
+    assert isinstance(paths, np.memmap)
+    section = BankPath(bank.root, spec, 1, start_timestamp=0)(CONFIG)
+    assert section["spot_list"][2]["custom"]["path"] == pytest.approx(paths[1, 1].tolist())
+    assert str(BankPath(bank.root, spec, 1, 0)) == f"{spec.key()}[1]"
@@ -0,0 +1,80 @@
+import threading
+from typing import Dict, Iterator
+
+import pytest
+from pipeline import Prefetcher
+
+
+def test_chunks_preserve_order() -> None:
+    prefetcher = Prefetcher(range(10), chunk_size=3, queue_depth=1)
+    assert list(prefetcher.chunks()) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert (prefetcher.stats.chunks, prefetcher.stats.items) == (4, 10)
+
+
+def test_source_errors_are_reraised() -> None:
+    def failing() -> Iterator[int]:
+        yield 1
+        raise ValueError("engine error")
+
+    with pytest.raises(ValueError, match="engine error"):
+        list(Prefetcher(failing(), chunk_size=2))
+
+
+class PanicException(BaseException):
+    """Stands for the exception PyO3 raises on a panic, which derives from BaseException directly."""
+
+
+class StubEngine:
+    """Simulation iterator of `n_steps` steps, optionally bound to the thread that created it like native objects."""
+
+    def __init__(self, n_steps: int, thread_bound: bool = False) -> None:
+        self.n_steps = n_steps
+        self.thread_bound = thread_bound
+        self.owner = threading.get_ident()
+        self.steps = 0
+        self.stepped: Dict[int, threading.Event] = {}
+
+    def reached(self, step: int) -> threading.Event:
+        return self.stepped.setdefault(step, threading.Event())
+
+    def __iter__(self) -> "StubEngine":
+        return self
+
+    def __next__(self) -> int:
+        if self.thread_bound and threading.get_ident() != self.owner:
+            raise PanicException("StubEngine is unsendable, but sent to another thread")
+        if self.steps == self.n_steps:
+            raise StopIteration
+        self.steps += 1
+        self.reached(self.steps).set()
+        return self.steps
+
+
+def test_engine_runs_ahead_while_chunks_are_processed() -> None:
+    engine = StubEngine(12)
+    # registered before the producer starts, so that the events are not created concurrently
+    ahead = engine.reached(8)
+    prefetcher = Prefetcher(engine, chunk_size=4, queue_depth=2)
+    chunks = prefetcher.chunks()
+    assert next(chunks) == [1, 2, 3, 4]
+    # the first chunk is still being processed: the engine fills the two queued chunks meanwhile
+    assert ahead.wait(timeout=5)
+    assert list(chunks) == [[5, 6, 7, 8], [9, 10, 11, 12]]
+    assert prefetcher.stats.background
+
+
+def test_thread_bound_source_falls_back_to_synchronous_stepping() -> None:
+    engine = StubEngine(5, thread_bound=True)
+    prefetcher = Prefetcher(engine, chunk_size=2)
+    assert list(prefetcher.chunks()) == [[1, 2], [3, 4], [5]]
+    assert not prefetcher.stats.background
+    assert (prefetcher.stats.chunks, prefetcher.stats.items) == (3, 5)
+
+
+def test_panic_after_the_first_step_is_reraised() -> None:
+    def panicking() -> Iterator[int]:
+        yield 1
+        raise PanicException("engine panic")
+
+    with pytest.raises(PanicException):
+        list(Prefetcher(panicking(), chunk_size=2))
@@ -0,0 +1,40 @@
+import pytest
+from schedule import WakeSchedule
+
+
+def test_wake_ups_are_merged_in_block_order() -> None:
+    schedule = WakeSchedule(100, 130).every(10, "rebalance").every(4, "fees", first_block=102).at(105, "once")
+    wake_ups = []
+    while schedule.peek() is not None:
+        block = schedule.peek()
+        wake_ups.append((block, sorted(schedule.pop_due(block))))
+    assert wake_ups == [
+        (100, ["rebalance"]),
+        (102, ["fees"]),
+        (105, ["once"]),
+        (106, ["fees"]),
+        (110, ["fees", "rebalance"]),
+        (114, ["fees"]),
+        (118, ["fees"]),
+        (120, ["rebalance"]),
+        (122, ["fees"]),
+        (126, ["fees"]),
+        (130, ["fees", "rebalance"]),
+    ]
+
+
+def test_skipped_blocks_reschedule_after_the_popped_block() -> None:
+    schedule = WakeSchedule(0, 100).every(10, "decide").at(15, "once")
+    assert schedule.pop_due(37) == {"decide", "once"}
+    # missed wake-ups at 10, 20 and 30 are reported once, and the period keeps its phase
+    assert schedule.peek() == 40
+
+
+def test_wake_ups_outside_the_range() -> None:
+    schedule = WakeSchedule(100, 120).every(7, "decide", first_block=90).at(99, "before").at(121, "after")
+    # the first periodic wake-up in range keeps the phase of `first_block`
+    assert schedule.peek() == 104
+    assert schedule.pop_due(120) == {"decide"}
+    assert schedule.peek() is None
+    with pytest.raises(ValueError):
+        schedule.every(0, "never")
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from shadow import ShadowPositions, load_volumes
+
+
+def make_positions() -> ShadowPositions:
+    # one range around the price, one below it
+    return ShadowPositions(np.array([0.99, 0.5]), np.array([1.01, 0.6]), fee=0.0001, value=10_000)
+
+
+def test_initial_value_and_no_fees_without_volume() -> None:
+    positions = make_positions()
+    for spot in (1.0, 1.001, 1.0):
+        positions.update(spot)
+    results = positions.results()
+    np.testing.assert_allclose(results["net_position"], 10_000)
+    assert not results["fees0"].any() and not results["fees1"].any()
+    # the net price move of a round trip still implies some fees, which are not counted
+    assert results["price_move_fees0"][0] > 0
+
+
+def test_fees_follow_volume_and_liquidity_share() -> None:
+    positions = make_positions()
+    positions.update(1.0)
+    positions.update(1.0, volume0=1_000.0, volume1=2_000.0, pool_liquidity=1e9)
+    share = positions.liquidity[0] / (1e9 + positions.liquidity[0])
+    assert positions.fees0[0] == pytest.approx(0.0001 * 1_000 * share)
+    assert positions.fees1[0] == pytest.approx(0.0001 * 2_000 * share)
+    # out of range positions earn nothing
+    assert positions.fees0[1] == positions.fees1[1] == 0
+
+
+def test_raw_volumes_are_converted_to_token_units(tmp_path) -> None:
+    token_units = tmp_path / "volumes.csv"
+    token_units.write_text("block,volume0,volume1,pool_liquidity\n1,1000,2000.5,1e9\n")
+    raw = tmp_path / "raw_volumes.csv"
+    raw.write_text("block,volume0_raw,volume1_raw,pool_liquidity_raw\n1,1000000000,2000500000,1000000000000000\n")
+    volumes = load_volumes(str(token_units))
+    assert volumes == {1: (1_000.0, 2_000.5, 1e9)}
+    assert load_volumes(str(raw), decimals=(6, 6)) == pytest.approx(volumes)
+
+    # fees accrued from the converted volumes are the ones of the token unit volumes
+    positions = make_positions()
+    positions.update(1.0)
+    positions.update(1.0, *load_volumes(str(raw), decimals=(6, 6))[1])
+    share = positions.liquidity[0] / (1e9 + positions.liquidity[0])
+    assert positions.fees0[0] == pytest.approx(0.0001 * 1_000 * share)
+    assert positions.fees1[0] == pytest.approx(0.0001 * 2_000.5 * share)
+
+
+@pytest.mark.parametrize(
+    "content, match",
+    [
+        ("block,amount0,amount1,liquidity\n1,1,1,1\n", "unexpected header"),
+        ("block,volume0_raw,volume1_raw,pool_liquidity_raw\n1,1,1,1\n", "decimals"),
+        ("block,volume0,volume1,pool_liquidity\n1,-1,1,1\n", "negative"),
+        ("block,volume0,volume1,pool_liquidity\n1,1,1,1\n1,2,2,2\n", "duplicate"),
+    ],
+)
+def test_volumes_with_unknown_units_are_rejected(tmp_path, content: str, match: str) -> None:
+    path = tmp_path / "volumes.csv"
+    path.write_text(content)
+    with pytest.raises(ValueError, match=match):
+        load_volumes(str(path))
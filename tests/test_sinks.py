@@ -0,0 +1,80 @@
+import os
+from typing import Any, Dict, List
+
+import pytest
+
+
+pa = pytest.importorskip("pyarrow")
+
+from sinks import RecordingPolicy, StreamingMetricSink, read_partial  # noqa: E402
+
+
+def test_sink_flushes_batches_and_downsamples(tmp_path) -> None:
+    path = str(tmp_path / "metrics.arrow")
+    with StreamingMetricSink(path, ["spot", "liquidity"], buffer_size=2, downsample={"liquidity": 2}) as sink:
+        for block in range(5):
+            observables = {"spot": float(block), "liquidity": 10.0 * block}
+            if block == 2:
+                del observables["liquidity"]
+            sink.append(block, observables)
+    table = read_partial(path)
+    assert sink.rows_written == table.num_rows == 5
+    assert table.column("spot").to_pylist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+    # means of (0, 10), (missing, 30) and the incomplete (40,), written on the last row of each bucket
+    assert table.column("liquidity").to_pylist() == [None, 5.0, None, 30.0, 40.0]
+
+
+def test_write_results_in_batches(tmp_path) -> None:
+    path = str(tmp_path / "results.arrow")
+    results = {"pool.fees": {"values": [1.0, 2.0, 3.0], "block_timestamps": [0, 12, 24]}}
+    with StreamingMetricSink(path, buffer_size=2) as sink:
+        sink.write_results(results, index=[10, 11, 12])
+    table = read_partial(path)
+    assert table.column("block").to_pylist() == [10, 11, 12]
+    assert table.column("pool.fees").to_pylist() == [1.0, 2.0, 3.0]
+
+
+def test_read_partial_stops_at_truncated_batch(tmp_path) -> None:
+    path = str(tmp_path / "metrics.arrow")
+    sink = StreamingMetricSink(path, ["spot"], buffer_size=1)
+    for block in range(4):
+        sink.append(block, {"spot": float(block)})
+    # three batches flushed, the fourth row is still buffered when the run is interrupted
+    size = os.path.getsize(path)
+    with open(path, "r+b") as f:
+        f.truncate(size - 8)
+    assert read_partial(path).column("spot").to_pylist() == [0.0, 1.0]
+
+
+class FakeProtocol:
+    def __init__(self) -> None:
+        self.spots: List[float] = []
+        self.calls = 0
+
+    def dex_spot(self) -> List[float]:
+        self.calls += 1
+        return list(self.spots)
+
+
+class Policy:
+    def __init__(self) -> None:
+        self.blocks: List[int] = []
+
+    def policy(self, block: int, protocols: Dict[str, Any]) -> None:
+        self.blocks.append(block)
+
+
+def test_recording_policy_reads_in_batches(tmp_path) -> None:
+    path = str(tmp_path / "coding.arrow")
+    protocol, inner = FakeProtocol(), Policy()
+    with StreamingMetricSink(path, ["pool.dex_spot"]) as sink:
+        recorder = RecordingPolicy(inner, sink, {"pool": ["dex_spot"]}, every=3)
+        for block in range(7):
+            protocol.spots.append(float(block))
+            recorder.policy(block, {"pool": protocol})
+        recorder.flush()
+    assert inner.blocks == list(range(7))
+    assert protocol.calls == 3
+    table = read_partial(path)
+    assert table.column("block").to_pylist() == list(range(7))
+    assert table.column("pool.dex_spot").to_pylist() == [float(block) for block in range(7)]
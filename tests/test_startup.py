@@ -0,0 +1,42 @@
+import importlib
+import os
+from types import ModuleType
+from typing import Iterator
+
+import pytest
+import startup
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), "..", "examples", "configs", "basic_liquidity_config.yml")
+
+
+@pytest.fixture
+def home_in_tmp_path(tmp_path, monkeypatch) -> Iterator[ModuleType]:
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    # the default cache directory is computed at import
+    yield importlib.reload(startup)
+    monkeypatch.undo()
+    importlib.reload(startup)
+
+
+def test_no_cache_by_default(tmp_path, home_in_tmp_path) -> None:
+    assert home_in_tmp_path.DEFAULT_CACHE_DIR.startswith(str(tmp_path))
+    config = home_in_tmp_path.load_config(CONFIG_PATH)
+    assert config["common"]["numeraire"]
+    assert not os.listdir(tmp_path)
+
+
+def test_cached_config_is_a_copy(tmp_path) -> None:
+    first = startup.load_config(CONFIG_PATH, cache_dir=str(tmp_path))
+    assert len(os.listdir(tmp_path / "configs")) == 1
+    first["common"]["numeraire"] = "changed"
+    assert startup.load_config(CONFIG_PATH, cache_dir=str(tmp_path))["common"]["numeraire"] != "changed"
+
+
+def test_validation_errors(tmp_path) -> None:
+    pytest.importorskip("jsonschema")
+    path = tmp_path / "invalid.yml"
+    path.write_text("common:\n  block_number_start: not a number\n")
+    with pytest.raises(startup.ConfigValidationError):
+        startup.load_config(str(path), validate=True)
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from schedule import WakeSchedule
+from stepping import Stepper
+
+
+def simulation(start: int, end: int, missing: Optional[int] = None) -> List[Any]:
+    steps = []
+    for block in range(start, end + 1):
+        observables: Dict[str, float] = {"pool.dex_spot": float(block), "pool.liquidity": 2.0 * block}
+        if block == missing:
+            del observables["pool.dex_spot"]
+        steps.append(SimpleNamespace(block=block, observables=observables))
+    return steps
+
+
+def test_step_many_chunk_boundaries() -> None:
+    stepper = Stepper(simulation(0, 9, missing=4), ["pool.dex_spot"])
+    chunk = stepper.step_many(4)
+    np.testing.assert_array_equal(chunk.blocks, [0, 1, 2, 3])
+    assert not stepper.done and chunk.last.block == 3
+
+    chunk = stepper.step_many(4)
+    np.testing.assert_array_equal(chunk.columns["pool.dex_spot"], [np.nan, 5.0, 6.0, 7.0])
+
+    # a short last chunk ends the simulation, and later calls return empty chunks
+    chunk = stepper.step_many(4, keys=["pool.liquidity"])
+    assert list(chunk.columns) == ["pool.liquidity"]
+    np.testing.assert_array_equal(chunk.columns["pool.liquidity"], [16.0, 18.0])
+    assert stepper.done
+    chunk = stepper.step_many(4)
+    assert len(chunk) == 0 and chunk.last is None and not chunk.decision_due
+
+
+def test_step_many_stops_at_the_decision_block() -> None:
+    schedule = WakeSchedule(0, 20).every(5, "decide", first_block=5)
+    stepper = Stepper(simulation(0, 20), ["pool.dex_spot"], schedule)
+    chunk = stepper.step_many(100)
+    np.testing.assert_array_equal(chunk.blocks, range(6))
+    assert chunk.decision_due
+
+    # while the decision is not popped, stepping stops after each step
+    assert stepper.step_many(100).blocks.tolist() == [6]
+    schedule.pop_due(6)
+    chunk = stepper.step_many(3)
+    assert chunk.blocks.tolist() == [7, 8, 9] and not chunk.decision_due
+    chunk = stepper.step_many(3)
+    assert chunk.blocks.tolist() == [10] and chunk.decision_due
+
+
+def test_step_many_rejects_empty_chunks() -> None:
+    with pytest.raises(ValueError):
+        Stepper(simulation(0, 1), []).step_many(0)
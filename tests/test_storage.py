@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from storage import Bucket, MetricSpec, ObservableStore, RingBuffer
+
+
+def test_ring_buffer_keeps_last_rows_contiguous() -> None:
+    ring = RingBuffer(capacity=4)
+    for block in range(10):
+        ring.append(block, float(block))
+        blocks, values = ring.tail()
+        np.testing.assert_array_equal(blocks, range(max(0, block - 3), block + 1))
+        np.testing.assert_array_equal(values, blocks)
+    assert len(ring) == 4 and ring.rows == 10
+    np.testing.assert_array_equal(ring.tail(2)[1], [8.0, 9.0])
+
+
+def test_ring_buffer_grows_without_capacity() -> None:
+    ring = RingBuffer(width=2, dtype=np.int64)
+    for block in range(100):
+        ring.append(block, [block, -block])
+    blocks, values = ring.tail()
+    assert values.shape == (100, 2)
+    np.testing.assert_array_equal(values[:, 1], -blocks)
+
+
+def test_bucket_modes() -> None:
+    values = [3.0, None, 5.0, float("nan"), 1.0, 2.0]
+    for mode, expected in [("last", [(5.0,), (2.0,)]), ("mean", [(4.0,), (1.5,)]), ("ohlc", [(3.0, 5.0, 3.0, 5.0)])]:
+        bucket = Bucket(4 if mode == "ohlc" else 3, mode)
+        rows = [row for row in map(bucket.add, values) if row is not None]
+        assert rows == expected[: len(rows)]
+    assert Bucket(2, "mean").add(None) is None
+    empty = Bucket(1, "ohlc")
+    assert empty.add(None) == (None, None, None, None)
+    assert empty.close() is None
+
+
+def test_integer_mean_is_exact() -> None:
+    bucket = Bucket(2, "mean")
+    bucket.add(2**62 + 1)
+    assert bucket.add(2**62 + 2) == (2**62 + 2,)  # rounded half up, float division would give 2**62
+
+
+def test_store_downsamples_and_flushes_incomplete_buckets() -> None:
+    store = ObservableStore({"spot": MetricSpec(bucket=3, mode="ohlc"), "fees": MetricSpec(bucket=3, mode="mean")})
+    for block, spot in enumerate([1.0, 3.0, 2.0, 4.0, 5.0]):
+        store.append(block, {"spot": spot, "fees": block})
+    store.flush()
+    blocks, bars = store.history("spot")
+    np.testing.assert_array_equal(blocks, [2, 4])
+    np.testing.assert_array_equal(bars, [[1.0, 3.0, 1.0, 2.0], [4.0, 5.0, 4.0, 5.0]])
+    np.testing.assert_array_equal(store.history("fees")[1], [1.0, 3.5])
+
+
+def test_store_ring_buffer_capacity() -> None:
+    store = ObservableStore({"liquidity": MetricSpec(capacity=3)})
+    for block in range(5):
+        store.append(block, {"liquidity": block * 10})
+    blocks, values = store.history("liquidity")
+    np.testing.assert_array_equal(blocks, [2, 3, 4])
+    np.testing.assert_array_equal(values, [20.0, 30.0, 40.0])
+
+
+def test_fixed_point_metric_with_missing_values() -> None:
+    store = ObservableStore({"amount": MetricSpec(dtype="int64", scale=6)})
+    for block, value in enumerate([1.5, None, 2.25]):
+        store.append(block, {} if value is None else {"amount": value})
+    blocks, values = store.history("amount")
+    np.testing.assert_array_equal(blocks, [0, 1, 2])
+    np.testing.assert_array_equal(values, [1.5, np.nan, 2.25])
+
+
+def test_fixed_point_overflow() -> None:
+    store = ObservableStore({"amount": MetricSpec(dtype="int64", scale=18)})
+    with pytest.raises(OverflowError):
+        store.append(0, {"amount": 1e6})
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytest
+from columnar import ColumnarResults
+from sweep import SweepResults, VariantOutcome, expand_grid, run_sweep, set_path
+
+
+pa = pytest.importorskip("pyarrow")
+
+
+def test_set_path_and_grid() -> None:
+    config = {"spot": {"spot_list": [{"gbm": {"vol": 0.1}}]}}
+    set_path(config, "spot.spot_list.0.gbm.vol", 0.2)
+    assert config["spot"]["spot_list"][0]["gbm"]["vol"] == 0.2
+    assert expand_grid({"a": [1, 2]}, seeds=[0, 1]) == [
+        {"a": 1, "simulation_environment.seed": 0},
+        {"a": 1, "simulation_environment.seed": 1},
+        {"a": 2, "simulation_environment.seed": 0},
+        {"a": 2, "simulation_environment.seed": 1},
+    ]
+
+
+def test_to_arrow_without_successful_variant() -> None:
+    sweep = SweepResults()
+    sweep.add(0, VariantOutcome({"a": 1}, 0.1, error="Traceback"))
+    table = sweep.to_arrow()
+    assert table.num_rows == 0
+    assert table.column_names == ["variant", "block"]
+
+
+def test_to_arrow_tags_rows_with_variant_and_params() -> None:
+    results = ColumnarResults.from_dict({"pool.fees": [1.0, 2.0]}, index=[10, 11])
+    sweep = SweepResults()
+    sweep.add(1, VariantOutcome({"a": 3}, 0.1, results=results))
+    table = sweep.to_arrow()
+    assert table.column_names == ["variant", "a", "block", "pool.fees"]
+    assert table.column("variant").to_pylist() == [1, 1]
+    np.testing.assert_array_equal(table.column("pool.fees").to_numpy(), [1.0, 2.0])
+
+
+def stub_runner(config: Dict[str, Any], factories: Optional[List[Any]]) -> Dict[str, Any]:
+    """Observables of a fake simulation: the variant volatility at each block, failing for a negative one."""
+    vol = config["spot"]["vol"]
+    if vol < 0:
+        raise ValueError("negative volatility")
+    n_blocks = config["common"]["n_blocks"]
+    return {"spot.vol": [vol] * n_blocks, "factories": [float(len(factories or []))] * n_blocks}
+
+
+def two_factories() -> List[Any]:
+    return [object(), object()]
+
+
+@pytest.mark.parametrize("start_method", [None, "spawn"])
+def test_run_sweep_with_stub_runner(start_method: Optional[str]) -> None:
+    config = {"common": {"n_blocks": 3, "block_number_start": 100, "block_step_metrics": 1}, "spot": {"vol": 0.0}}
+    progress = []
+    sweep = run_sweep(
+        config,
+        expand_grid({"spot.vol": [0.1, -1.0, 0.3]}),
+        factories=two_factories,
+        max_workers=2,
+        on_progress=lambda done, total, index, outcome: progress.append((done, total, index, outcome.ok)),
+        start_method=start_method,
+        runner=stub_runner,
+    )
+    assert sorted(index for _, _, index, _ in progress) == [0, 1, 2]
+    assert [done for done, _, _, _ in progress] == [1, 2, 3]
+    assert set(sweep.failures) == {1}
+    assert "negative volatility" in (sweep.failures[1].error or "")
+    results = sweep.outcomes[2].results
+    assert results is not None
+    np.testing.assert_array_equal(results.columns["spot.vol"], [0.3, 0.3, 0.3])
+    np.testing.assert_array_equal(results.index, [100, 101, 102])
+    assert results.columns["factories"][-1] == 2
+    assert config["spot"]["vol"] == 0.0